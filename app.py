@@ -1,13 +1,29 @@
+import asyncio
+import hashlib
+import json
 import os
 import shutil
 import tempfile
+import threading
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Tuple
 
-from fastapi import FastAPI, UploadFile, File, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Request, Response, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
+from video_features import metrics
+
+from video_features.cache import ResultCache, result_key
 from video_features.extractor import FeatureExtractionConfig, VideoFeatureExtractor, FarnebackParams, HistogramParams
+from video_features.jobs import Job, JobCancelledError, JobManager, JobTarget, QueueFullError, JOB_CANCELLED, JOB_DONE, JOB_FAILED
+from video_features.models import registry
+from video_features.ocr import is_ocr_warm, warm_ocr_backend
+from video_features.quota import UsageLedger
+from video_features.segments import shutdown_segment_pools
 from video_features.settings import AppSettings, ExtractorSettings
 
 app_cfg = AppSettings.load()
@@ -18,12 +34,88 @@ INDEX_HTML = STATIC_DIR / "index.html"
 
 app_cfg.temp_volume_dir.mkdir(parents=True, exist_ok=True)
 
-app = FastAPI(title=app_cfg.app_title)
+registry.resize(app_cfg.model_registry_size)
+
+ledger = UsageLedger(app_cfg.temp_volume_dir, reconcile_seconds=app_cfg.quota_reconcile_seconds)
+
+cache = ResultCache(app_cfg.result_cache_dir, app_cfg.result_cache_max_bytes) if app_cfg.result_cache_enabled else None
+
+jobs = JobManager(
+    workers=app_cfg.job_workers,
+    queue_depth=app_cfg.job_queue_depth,
+    result_ttl_seconds=app_cfg.job_result_ttl_seconds,
+)
+
+
+def _warm_models() -> None:
+    try:
+        registry.warm(ext_env.yolo_model)
+    except Exception:
+        pass
+    try:
+        warm_ocr_backend(ext_env.ocr_backend, ext_env.ocr_workers)
+    except Exception:
+        pass
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    if app_cfg.warmup_models:
+        threading.Thread(target=_warm_models, name="model-warmup", daemon=True).start()
+    ledger.start()
+    yield
+    jobs.shutdown()
+    shutdown_segment_pools()
+    ledger.stop()
+
+
+app = FastAPI(title=app_cfg.app_title, lifespan=lifespan)
 
 if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next: Callable[[Request], Awaitable[Response]]) -> Response:
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Label by route template so per-job URLs do not each become a new series.
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        metrics.http_requests.inc(method=request.method, route=route, status=str(status))
+        metrics.http_latency.observe(time.perf_counter() - started, method=request.method, route=route)
+
+
+def _service_metrics() -> Iterator[metrics.Family]:
+    usage = shutil.disk_usage(app_cfg.temp_volume_dir)
+    yield "vf_temp_used_bytes", "gauge", "Bytes reserved on the temp volume by uploads in flight or awaiting processing.", [({}, ledger.used)]
+    yield "vf_temp_quota_bytes", "gauge", "Temp volume quota (VOLUME_QUOTA_BYTES).", [({}, app_cfg.volume_quota_bytes)]
+    yield "vf_temp_free_bytes", "gauge", "Free bytes on the temp volume's filesystem.", [({}, usage.free)]
+    yield "vf_job_queue_depth", "gauge", "Jobs waiting for a worker.", [({}, jobs.queue_depth)]
+    yield "vf_job_queue_capacity", "gauge", "Job queue capacity (JOB_QUEUE_DEPTH).", [({}, app_cfg.job_queue_depth)]
+    yield "vf_jobs_running", "gauge", "Jobs currently being extracted.", [({}, jobs.running)]
+    models = registry.stats()
+    yield "vf_models_loaded", "gauge", "YOLO models resident in the registry.", [({}, len(models["loaded"]))]
+    yield "vf_model_loads_total", "counter", "YOLO model loads.", [({}, models["loads"])]
+    yield "vf_model_hits_total", "counter", "YOLO registry hits.", [({}, models["hits"])]
+    yield "vf_model_evictions_total", "counter", "YOLO registry evictions.", [({}, models["evictions"])]
+    yield "vf_model_load_seconds_total", "counter", "Time spent loading YOLO models.", [({}, models["load_seconds_total"])]
+    if cache is not None:
+        stats = cache.stats()
+        yield "vf_cache_bytes", "gauge", "Result cache size on disk.", [({}, stats["bytes"])]
+        yield "vf_cache_entries", "gauge", "Result cache entries.", [({}, stats["entries"])]
+        yield "vf_cache_hits_total", "counter", "Result cache hits.", [({}, stats["hits"])]
+        yield "vf_cache_misses_total", "counter", "Result cache misses.", [({}, stats["misses"])]
+        yield "vf_cache_evictions_total", "counter", "Result cache evictions.", [({}, stats["evictions"])]
+
+
+metrics.registry.collector(_service_metrics)
+
+
 def _ensure_valid_upload(file: UploadFile) -> str:
     ext = Path(file.filename or "").suffix.lower()
     if ext not in app_cfg.allowed_extensions:
@@ -34,64 +126,181 @@ def _ensure_valid_upload(file: UploadFile) -> str:
     return ext
 
 
-def _dir_size_bytes(root: Path) -> int:
-    total = 0
-    for p in root.rglob("*"):
-        try:
-            if p.is_file():
-                total += p.stat().st_size
-        except OSError:
-            continue
-    return total
-
-
 class _Quota:
     def __init__(self, root: Path) -> None:
         self.root = root
-        self.start = _dir_size_bytes(root)
         self.written = 0
+        self.reserved = 0
+        self.preallocated = 0
+        self._free: Optional[int] = None
+        self._since_sample = 0
+
+    def _free_bytes(self) -> int:
+        # statvfs per chunk is wasted work on big uploads; resample every DISK_USAGE_SAMPLE_BYTES and extrapolate.
+        if self._free is None or self._since_sample >= app_cfg.disk_usage_sample_bytes:
+            self._free = shutil.disk_usage(self.root).free
+            self._since_sample = 0
+        return self._free - self._since_sample
 
     def check(self, n: int) -> None:
         if self.written + n > app_cfg.max_upload_bytes:
+            metrics.quota_rejections.inc(status="413")
             raise HTTPException(status_code=413, detail=f"Upload exceeds {app_cfg.max_upload_bytes // (1024 * 1024)} MB limit.")
-        projected = self.start + self.written + n
-        if projected > app_cfg.volume_quota_bytes:
-            raise HTTPException(status_code=429, detail="Temporary storage quota exceeded.")
-        free_after = shutil.disk_usage(self.root).free - n
+        # Bytes admitted up front for a preallocated upload are not checked again chunk by chunk.
+        unreserved = self.written + n - self.reserved
+        if unreserved <= 0:
+            return
+        free_after = self._free_bytes() - unreserved
         if free_after < app_cfg.volume_min_free_bytes:
+            metrics.quota_rejections.inc(status="507")
             raise HTTPException(status_code=507, detail="Insufficient free space on processing volume.")
+        if not ledger.try_reserve(unreserved, app_cfg.volume_quota_bytes):
+            metrics.quota_rejections.inc(status="429")
+            raise HTTPException(status_code=429, detail="Temporary storage quota exceeded.")
+        self.reserved += unreserved
+
+    def preallocate(self, fd: int, size: int) -> bool:
+        self.check(size)
+        if not _preallocate(fd, size):
+            return False
+        # The allocation already came off the disk; resample so it is not subtracted a second time.
+        self.preallocated = size
+        self._free = None
+        return True
 
     def add(self, n: int) -> None:
+        # Only bytes past the preallocated extent consume new disk space.
+        self._since_sample += max(0, self.written + n - max(self.written, self.preallocated))
         self.written += n
+        metrics.upload_bytes.inc(n)
+
+    def settle(self) -> None:
+        # A preallocated upload may end short of its declared size; hand the unused reservation back.
+        if self.reserved > self.written:
+            ledger.release(self.reserved - self.written)
+            self.reserved = self.written
+
+    def abandon(self, path: str) -> None:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        ledger.release(self.reserved)
+        self.reserved = 0
+
+
+def _temp_headroom() -> Dict[str, Any]:
+    free = shutil.disk_usage(app_cfg.temp_volume_dir).free
+    used = ledger.used
+    return {
+        "ok": free >= app_cfg.volume_min_free_bytes and used < app_cfg.volume_quota_bytes,
+        "free_bytes": free,
+        "min_free_bytes": app_cfg.volume_min_free_bytes,
+        "used_bytes": used,
+        "quota_bytes": app_cfg.volume_quota_bytes,
+    }
 
 
-async def _stream_upload_to_tempfile(upload: UploadFile, suffix: str) -> str:
+def _expected_upload_size(upload: UploadFile) -> Optional[int]:
+    size = getattr(upload, "size", None)
+    if isinstance(size, int) and 0 < size <= app_cfg.max_upload_bytes:
+        return size
+    return None
+
+
+def _preallocate(fd: int, size: int) -> bool:
+    if not hasattr(os, "posix_fallocate"):
+        return False
+    try:
+        os.posix_fallocate(fd, 0, size)
+        return True
+    except OSError:
+        return False
+
+
+def _write_chunk(tmp: Any, digest: Any, chunk: bytes) -> None:
+    tmp.write(chunk)
+    digest.update(chunk)
+
+
+def _finish_tempfile(tmp: Any, total: int, preallocated: bool) -> None:
+    tmp.flush()
+    if preallocated:
+        os.ftruncate(tmp.fileno(), total)
+    tmp.close()
+
+
+async def _stream_upload_to_tempfile(upload: UploadFile, suffix: str) -> Tuple[str, str]:
     quota = _Quota(app_cfg.temp_volume_dir)
     tmp = tempfile.NamedTemporaryFile(dir=str(app_cfg.temp_volume_dir), prefix="vs_", suffix=suffix, delete=False)
+    digest = hashlib.blake2b(digest_size=32)
     try:
+        expected = _expected_upload_size(upload) if app_cfg.upload_preallocate else None
+        preallocated = False
+        if expected is not None:
+            preallocated = await run_in_threadpool(quota.preallocate, tmp.fileno(), expected)
         total = 0
         while True:
             chunk = await upload.read(app_cfg.upload_chunk_bytes)
             if not chunk:
                 break
             quota.check(len(chunk))
-            tmp.write(chunk)
+            await run_in_threadpool(_write_chunk, tmp, digest, chunk)
             total += len(chunk)
             quota.add(len(chunk))
         if total == 0:
             raise HTTPException(status_code=400, detail="Empty upload.")
-        return tmp.name
-    finally:
+        await run_in_threadpool(_finish_tempfile, tmp, total, preallocated)
+        quota.settle()
+        return tmp.name, digest.hexdigest()
+    except BaseException:
         try:
             tmp.close()
         except Exception:
             pass
+        quota.abandon(tmp.name)
+        raise
+    finally:
         try:
             await upload.close()
         except Exception:
             pass
 
 
+def _unlink_quietly(path: str) -> None:
+    ledger.release_file(path)
+
+
+def _cached_result(key: str, temp_path: str) -> Optional[Dict[str, Any]]:
+    if cache is None:
+        return None
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    return {"video_path": str(Path(temp_path).resolve()), **cached}
+
+
+def _store_result(key: str, features: Dict[str, Any]) -> None:
+    if cache is None:
+        return
+    try:
+        # Timings describe the run that produced the entry, not a later cache hit.
+        cache.put(key, {k: v for k, v in features.items() if k not in ("video_path", "timings")})
+    except OSError:
+        pass
+
+
+def _run_extraction(cfg: FeatureExtractionConfig, temp_path: str, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    # Constructing the extractor may load YOLO weights (cold registry, eviction, or waiting on warm-up), so it runs
+    # here on the worker thread rather than on the event loop.
+    extractor = VideoFeatureExtractor(cfg)
+    started = time.perf_counter()
+    features = extractor.extract_features(temp_path, progress=progress)
+    metrics.extraction_latency.observe(time.perf_counter() - started)
+    metrics.frames_processed.inc(features["frames_processed"])
+    return features
+
+
 def _build_feature_config() -> FeatureExtractionConfig:
     farneback = FarnebackParams(
         pyr_scale=ext_env.farneback_pyr_scale,
@@ -102,7 +311,7 @@ def _build_feature_config() -> FeatureExtractionConfig:
         poly_sigma=ext_env.farneback_poly_sigma,
         flags=ext_env.farneback_flags,
     )
-    hist = HistogramParams(bins=ext_env.histogram_bins, ranges=ext_env.histogram_ranges)
+    hist = HistogramParams(bins=ext_env.histogram_bins, ranges=ext_env.histogram_ranges, decimate=ext_env.histogram_decimate)
     return FeatureExtractionConfig(
         frame_stride=ext_env.frame_stride,
         resize_width=ext_env.resize_width,
@@ -111,6 +320,28 @@ def _build_feature_config() -> FeatureExtractionConfig:
         text_min_chars=ext_env.text_min_chars,
         yolo_model=ext_env.yolo_model,
         yolo_frame_stride=ext_env.yolo_frame_stride,
+        seek_min_stride=ext_env.seek_min_stride,
+        frame_source=ext_env.frame_source,
+        decode_threads=ext_env.decode_threads,
+        decode_keyframes_only=ext_env.decode_keyframes_only,
+        yolo_batch_size=ext_env.yolo_batch_size,
+        yolo_batch_max_bytes=ext_env.yolo_batch_max_bytes,
+        pipeline=ext_env.pipeline,
+        pipeline_queue_size=ext_env.pipeline_queue_size,
+        pipeline_text_workers=ext_env.pipeline_text_workers,
+        segments=ext_env.segments,
+        segment_workers=ext_env.segment_workers,
+        ocr_backend=ext_env.ocr_backend,
+        ocr_workers=ext_env.ocr_workers,
+        text_prefilter=ext_env.text_prefilter,
+        text_prefilter_min_score=ext_env.text_prefilter_min_score,
+        text_crop_regions=ext_env.text_crop_regions,
+        text_early_exit=ext_env.text_early_exit,
+        flow_width=ext_env.flow_width,
+        reuse_buffers=ext_env.reuse_buffers,
+        stage_timings=ext_env.stage_timings,
+        motion_method=ext_env.motion_method,
+        lk_grid_step=ext_env.lk_grid_step,
         farneback=farneback,
         hist=hist,
     )
@@ -128,20 +359,163 @@ def health_check() -> JSONResponse:
     return JSONResponse(content={"status": "healthy", "service": app_cfg.app_title}, status_code=200)
 
 
+def _readiness_checks() -> Dict[str, Dict[str, Any]]:
+    # With WARMUP_MODELS off the models load lazily on the first request, so they cannot gate readiness.
+    detector_warm = ext_env.yolo_model in registry.stats()["warm"]
+    try:
+        ocr_warm = is_ocr_warm(ext_env.ocr_backend, ext_env.ocr_workers)
+    except ValueError:
+        ocr_warm = False
+    depth = jobs.queue_depth
+    return {
+        "detector": {"ok": detector_warm or not app_cfg.warmup_models, "warm": detector_warm, "model": ext_env.yolo_model},
+        "ocr": {"ok": ocr_warm or not app_cfg.warmup_models, "warm": ocr_warm, "backend": ext_env.ocr_backend},
+        "queue": {"ok": depth <= app_cfg.ready_max_queue_depth, "depth": depth, "max_depth": app_cfg.ready_max_queue_depth, "running": jobs.running},
+        "temp_volume": _temp_headroom(),
+    }
+
+
+@app.get("/ready")
+def readiness_check() -> JSONResponse:
+    checks = _readiness_checks()
+    ready = all(check["ok"] for check in checks.values())
+    return JSONResponse(content={"status": "ready" if ready else "not_ready", "checks": checks}, status_code=200 if ready else 503)
+
+
+@app.get("/metrics")
+def metrics_endpoint() -> Response:
+    return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/models")
+def model_stats() -> JSONResponse:
+    return JSONResponse(content=registry.stats(), status_code=200)
+
+
+@app.get("/cache")
+def cache_stats() -> JSONResponse:
+    if cache is None:
+        return JSONResponse(content={"enabled": False}, status_code=200)
+    return JSONResponse(content={"enabled": True, **cache.stats()}, status_code=200)
+
+
 @app.post("/extract")
 async def extract(file: UploadFile = File(...)) -> JSONResponse:
     ext = _ensure_valid_upload(file)
-    temp_path = await _stream_upload_to_tempfile(file, suffix=ext)
+    temp_path, digest = await _stream_upload_to_tempfile(file, suffix=ext)
+    cfg = _build_feature_config()
+    key = result_key(digest, cfg)
+    cached = await run_in_threadpool(_cached_result, key, temp_path)
+    if cached is not None:
+        await run_in_threadpool(_unlink_quietly, temp_path)
+        return JSONResponse(content=cached, status_code=200)
     try:
-        extractor = VideoFeatureExtractor(_build_feature_config())
-        features = extractor.extract_features(temp_path)
+        features = await run_in_threadpool(_run_extraction, cfg, temp_path)
+        await run_in_threadpool(_store_result, key, features)
     except FileNotFoundError:
         raise HTTPException(status_code=400, detail="Failed to read uploaded video file.")
     except Exception as exc:
         raise HTTPException(status_code=500, detail="Video processing failed.") from exc
     finally:
-        try:
-            os.unlink(temp_path)
-        except OSError:
-            pass
+        await run_in_threadpool(_unlink_quietly, temp_path)
     return JSONResponse(content=features, status_code=200)
+
+
+def _extraction_job(temp_path: str, cfg: FeatureExtractionConfig, key: str) -> JobTarget:
+    def run(job: Job) -> Dict[str, Any]:
+        try:
+            features = _run_extraction(cfg, temp_path, progress=job.update_progress)
+            _store_result(key, features)
+            return features
+        except JobCancelledError:
+            raise
+        except FileNotFoundError as exc:
+            raise RuntimeError("Failed to read uploaded video file.") from exc
+        except Exception as exc:
+            raise RuntimeError("Video processing failed.") from exc
+
+    return run
+
+
+def _get_job(job_id: str) -> Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'.")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(file: UploadFile = File(...)) -> JSONResponse:
+    ext = _ensure_valid_upload(file)
+    if jobs.saturated():
+        raise HTTPException(status_code=503, detail="Extraction queue is full. Retry later.")
+    temp_path, digest = await _stream_upload_to_tempfile(file, suffix=ext)
+    cfg = _build_feature_config()
+    key = result_key(digest, cfg)
+    cached = await run_in_threadpool(_cached_result, key, temp_path)
+    if cached is not None:
+        await run_in_threadpool(_unlink_quietly, temp_path)
+        return JSONResponse(content=jobs.completed(cached).snapshot(), status_code=202)
+    try:
+        job = jobs.submit(_extraction_job(temp_path, cfg, key), cleanup=lambda: _unlink_quietly(temp_path))
+    except QueueFullError:
+        await run_in_threadpool(_unlink_quietly, temp_path)
+        raise HTTPException(status_code=503, detail="Extraction queue is full. Retry later.")
+    return JSONResponse(content=job.snapshot(), status_code=202)
+
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str) -> JSONResponse:
+    return JSONResponse(content=_get_job(job_id).snapshot(), status_code=200)
+
+
+@app.delete("/jobs/{job_id}")
+def cancel_job(job_id: str) -> JSONResponse:
+    job = jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'.")
+    return JSONResponse(content=job.snapshot(), status_code=202 if not job.finished else 200)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _job_events(job: Job) -> AsyncIterator[str]:
+    seen = -1
+    last_sent = time.monotonic()
+    while True:
+        if job.finished:
+            payload = job.snapshot()
+            if job.status == JOB_DONE:
+                payload["result"] = job.result
+            yield _sse(job.status, payload)
+            return
+        if job.version != seen:
+            seen = job.version
+            last_sent = time.monotonic()
+            yield _sse("progress", job.snapshot())
+        elif time.monotonic() - last_sent >= 15.0:
+            # Comment line keeps idle proxies from closing the stream while a job waits in the queue.
+            last_sent = time.monotonic()
+            yield ": keep-alive\n\n"
+        await asyncio.sleep(app_cfg.job_event_interval_seconds)
+
+
+@app.get("/jobs/{job_id}/events")
+def job_events(job_id: str) -> StreamingResponse:
+    job = _get_job(job_id)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_job_events(job), media_type="text/event-stream", headers=headers)
+
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str) -> JSONResponse:
+    job = _get_job(job_id)
+    if job.status == JOB_FAILED:
+        raise HTTPException(status_code=500, detail=job.error or "Video processing failed.")
+    if job.status == JOB_CANCELLED:
+        raise HTTPException(status_code=409, detail="Job was cancelled.")
+    if job.status != JOB_DONE:
+        return JSONResponse(content=job.snapshot(), status_code=202)
+    return JSONResponse(content=job.result, status_code=200)
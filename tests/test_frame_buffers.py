@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from video_features import extractor as extractor_module
+from video_features.extractor import FeatureExtractionConfig, VideoFeatureExtractor, _RunState
+
+# 3840x2160, so every per-frame temporary (resize, HSV, gray, flow field) is large enough to show up.
+SAMPLE = Path(__file__).resolve().parents[1] / "samples" / "people-at-work.mp4"
+WARMUP_FRAMES = 3
+MEASURED_FRAMES = 30
+
+
+def _steady_state_peak(monkeypatch: pytest.MonkeyPatch, reuse_buffers: bool) -> int:
+    # OCR and YOLO samples are pushed past the end of the run, so no detector is needed.
+    monkeypatch.setattr(extractor_module, "get_detector", lambda model_path: None)
+    config = FeatureExtractionConfig(
+        frame_stride=1,
+        reuse_buffers=reuse_buffers,
+        text_sample_stride=10**9,
+        yolo_frame_stride=10**9,
+        ocr_workers=1,
+    )
+    extractor = VideoFeatureExtractor(config)
+    state = _RunState()
+    peak = 0
+    tracemalloc.start()
+    try:
+        with extractor._open_source(SAMPLE) as source:
+            for n, frame in enumerate(source):
+                if n == WARMUP_FRAMES + MEASURED_FRAMES:
+                    break
+                # Only allocations inside _observe count; decoding the next frame happens outside the window.
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                extractor._observe(state, frame)
+                if n >= WARMUP_FRAMES:
+                    peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    assert state.processed_frames == WARMUP_FRAMES + MEASURED_FRAMES
+    return peak
+
+
+def test_reused_buffers_allocate_almost_nothing_per_frame(monkeypatch: pytest.MonkeyPatch) -> None:
+    reused = _steady_state_peak(monkeypatch, reuse_buffers=True)
+    fresh = _steady_state_peak(monkeypatch, reuse_buffers=False)
+    assert reused < 64 * 1024
+    assert fresh > 1024 * 1024
+    assert fresh > 50 * reused
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pytest
+
+from video_features import extractor as extractor_module
+from video_features import segments
+from video_features.extractor import FeatureExtractionConfig, VideoFeatureExtractor
+from video_features.segments import segment_bounds
+
+SAMPLE = Path(__file__).resolve().parents[1] / "samples" / "movie-trailer.mp4"
+
+
+class _BrightnessOcr:
+    # Deterministic per frame, so a segment whose OCR cadence is off by one frame changes text_present_ratio.
+    def read_text(self, image: np.ndarray, single_line: bool = False) -> str:
+        return "x" * (int(image.mean()) % 16)
+
+
+@pytest.fixture
+def in_process_pool(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    # Spawned workers would not see the stubs, so segments run on a thread in this process instead; the split,
+    # seam priming and merging are the same code paths.
+    monkeypatch.setattr(extractor_module, "get_detector", lambda model_path: None)
+    monkeypatch.setattr(extractor_module, "get_ocr_backend", lambda name, workers: _BrightnessOcr())
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(segments, "_get_pool", lambda config: pool)
+    yield
+    pool.shutdown(wait=True)
+
+
+def _extract(segment_count: int, **overrides: object) -> dict:
+    config = FeatureExtractionConfig(segments=segment_count, ocr_workers=1, yolo_frame_stride=10**9, **overrides)
+    extractor = VideoFeatureExtractor(config)
+    if segment_count > 1:
+        segments._worker = VideoFeatureExtractor(replace(config, segments=1))
+    try:
+        return extractor.extract_features(SAMPLE)
+    finally:
+        segments._worker = None
+
+
+def test_segmented_counters_match_sequential(in_process_pool: None) -> None:
+    sequential = _extract(1)
+    segmented = _extract(3)
+    assert segmented == pytest.approx(sequential)
+    assert sequential["hard_cuts"] > 0
+    assert 0 < sequential["text_present_ratio"] < 1
+
+
+def test_keyframe_runs_match_with_segments_requested(in_process_pool: None) -> None:
+    assert _extract(3, decode_keyframes_only=True) == pytest.approx(_extract(1, decode_keyframes_only=True))
+
+
+def test_segment_bounds_cover_the_video_on_stride_boundaries() -> None:
+    bounds = segment_bounds(243, 5, 3)
+    assert bounds[0][0] == 0 and bounds[-1][1] == 243
+    assert all(end == start for (_, end), (start, _) in zip(bounds, bounds[1:]))
+    assert all(start % 5 == 0 for start, _ in bounds)
+
+
+def test_segment_bounds_with_fewer_frames_than_stride() -> None:
+    assert segment_bounds(3, 5, 4) == [(0, 3)]
+    assert segment_bounds(1, 1, 8) == [(0, 1)]
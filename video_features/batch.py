@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, TextIO
+
+from video_features.extractor import FeatureExtractionConfig, VideoFeatureExtractor
+
+_worker: Optional[VideoFeatureExtractor] = None
+
+
+def _init_worker(config: FeatureExtractionConfig) -> None:
+    global _worker
+    # One extractor (and one YOLO load) per worker process, reused for every file it is handed.
+    _worker = VideoFeatureExtractor(replace(config, segments=1))
+
+
+def _extract(video: str) -> Dict[str, Any]:
+    extractor = _worker
+    assert extractor is not None
+    started = time.perf_counter()
+    try:
+        features = extractor.extract_features(video)
+    except Exception as exc:
+        return {"video": video, "error": str(exc) or exc.__class__.__name__, "seconds": time.perf_counter() - started}
+    return {"video": video, "features": features, "seconds": time.perf_counter() - started}
+
+
+def scan_dir(root: Path, extensions: Sequence[str]) -> List[Path]:
+    wanted = {ext.lower() for ext in extensions}
+    return sorted(p for p in root.rglob("*") if p.is_file() and p.suffix.lower() in wanted)
+
+
+def read_manifest(manifest: Path) -> List[Path]:
+    paths = []
+    for line in manifest.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        path = Path(line)
+        paths.append(path if path.is_absolute() else manifest.parent / path)
+    return paths
+
+
+def completed_videos(output: Path) -> Set[str]:
+    done: Set[str] = set()
+    if not output.exists():
+        return done
+    with output.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A run killed mid-write leaves a truncated last line; that file is simply redone.
+                continue
+            if isinstance(record, dict) and "features" in record:
+                done.add(record["video"])
+    return done
+
+
+def _open_output(output: Path) -> TextIO:
+    out = output.open("a+", encoding="utf-8")
+    out.seek(0, 2)
+    if out.tell() > 0:
+        out.seek(out.tell() - 1)
+        if out.read(1) != "\n":
+            out.write("\n")
+    return out
+
+
+def run_batch(
+    videos: Iterable[Path],
+    config: FeatureExtractionConfig,
+    output: Path,
+    workers: int = 1,
+    log: Optional[TextIO] = sys.stderr,
+) -> int:
+    done = completed_videos(output)
+    pending = [str(v.resolve()) for v in videos]
+    todo = [v for v in dict.fromkeys(pending) if v not in done]
+    if log is not None and len(todo) < len(pending):
+        log.write(f"skipping {len(pending) - len(todo)} already completed\n")
+    failures = 0
+    with _open_output(output) as out:
+        def record(result: Dict[str, Any], n: int) -> None:
+            nonlocal failures
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            failures += int("error" in result)
+            if log is not None:
+                status = f"error: {result['error']}" if "error" in result else "ok"
+                log.write(f"[{n}/{len(todo)}] {result['video']} {status} ({result['seconds']:.1f}s)\n")
+
+        if workers <= 1:
+            _init_worker(config)
+            for n, video in enumerate(todo, 1):
+                record(_extract(video), n)
+            return failures
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(config,),
+        ) as pool:
+            # Keep a bounded window in flight so huge backfills do not queue every path up front.
+            queue = iter(todo)
+            inflight: Set["Future[Dict[str, Any]]"] = set()
+            finished = 0
+            while True:
+                while len(inflight) < workers * 2:
+                    video = next(queue, None)
+                    if video is None:
+                        break
+                    inflight.add(pool.submit(_extract, video))
+                if not inflight:
+                    break
+                ready, inflight = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in ready:
+                    finished += 1
+                    record(future.result(), finished)
+    return failures
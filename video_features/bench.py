@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import sys
+import time
+from dataclasses import asdict, replace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from video_features.cli import _env_cfg
+from video_features.extractor import FeatureExtractionConfig, VideoFeatureExtractor
+
+DEFAULT_SAMPLES = Path(__file__).resolve().parent.parent / "samples"
+
+
+def _sample_videos(paths: Sequence[str]) -> List[Path]:
+    if paths:
+        return [Path(p) for p in paths]
+    return sorted(DEFAULT_SAMPLES.glob("*.mp4"))
+
+
+def _count_cuts(extractor: VideoFeatureExtractor, video: Path) -> Dict[str, Any]:
+    cfg = extractor.config
+    cuts = 0
+    frames = 0
+    hist_seconds = 0.0
+    prev_hist: Optional[np.ndarray] = None
+    with extractor._open_source(video) as source:
+        for frame in source:
+            frames += 1
+            small = extractor._resize_to_width(frame.image, cfg.resize_width)
+            started = time.perf_counter()
+            hist = extractor._hsv_histogram(small)
+            hist_seconds += time.perf_counter() - started
+            if prev_hist is not None and extractor._bhattacharyya(prev_hist, hist) > cfg.shot_threshold:
+                cuts += 1
+            prev_hist = hist
+    return {"frames": frames, "hard_cuts": cuts, "histogram_ms_per_frame": (hist_seconds / frames * 1000.0) if frames else 0.0}
+
+
+def compare_histograms(videos: Sequence[Path], base: FeatureExtractionConfig, decimate: int) -> List[Dict[str, Any]]:
+    reference = VideoFeatureExtractor(replace(base, hist=replace(base.hist, decimate=1)))
+    candidate = VideoFeatureExtractor(replace(base, hist=replace(base.hist, decimate=decimate)))
+    rows = []
+    for video in videos:
+        ref = _count_cuts(reference, video)
+        cand = _count_cuts(candidate, video)
+        rows.append({
+            "video": video.name,
+            "decimate": decimate,
+            "hard_cuts_reference": ref["hard_cuts"],
+            "hard_cuts_candidate": cand["hard_cuts"],
+            "match": ref["hard_cuts"] == cand["hard_cuts"],
+            "reference_ms_per_frame": ref["histogram_ms_per_frame"],
+            "candidate_ms_per_frame": cand["histogram_ms_per_frame"],
+        })
+    return rows
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is the process high-water mark (KiB on Linux), so it never drops between videos.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def run_suite(videos: Sequence[Path], config: FeatureExtractionConfig, repeat: int = 1) -> Dict[str, Any]:
+    rows = []
+    for video in videos:
+        best: Optional[Dict[str, Any]] = None
+        extractor = VideoFeatureExtractor(replace(config, stage_timings=True))
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            features = extractor.extract_features(video)
+            seconds = time.perf_counter() - started
+            frames = features["frames_processed"]
+            row = {
+                "video": video.name,
+                "frames_processed": frames,
+                "seconds": seconds,
+                "fps": frames / seconds if seconds > 0 else 0.0,
+                "stages": features["timings"],
+                "peak_rss_mb": _peak_rss_mb(),
+            }
+            if best is None or row["seconds"] < best["seconds"]:
+                best = row
+        assert best is not None
+        rows.append(best)
+    frames = sum(r["frames_processed"] for r in rows)
+    seconds = sum(r["seconds"] for r in rows)
+    return {
+        "created_at": time.time(),
+        "config": asdict(config),
+        "videos": rows,
+        "total": {"frames_processed": frames, "seconds": seconds, "fps": frames / seconds if seconds > 0 else 0.0, "peak_rss_mb": _peak_rss_mb()},
+    }
+
+
+def compare_runs(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    # A regression is fps falling, or a stage's per-call time rising, by more than `threshold` (a fraction).
+    old_rows = {row["video"]: row for row in baseline.get("videos", [])}
+    rows = []
+    for row in current["videos"]:
+        old = old_rows.get(row["video"])
+        if old is None:
+            continue
+        regressions = []
+        if row["fps"] < old["fps"] * (1.0 - threshold):
+            regressions.append("fps")
+        for stage, timing in row["stages"].items():
+            old_timing = old["stages"].get(stage)
+            if old_timing and timing["ms_per_call"] > old_timing["ms_per_call"] * (1.0 + threshold):
+                regressions.append(stage)
+        rows.append({"video": row["video"], "fps_baseline": old["fps"], "fps": row["fps"], "regressions": regressions})
+    return rows
+
+
+def _print_suite(suite: Dict[str, Any]) -> None:
+    for row in suite["videos"]:
+        stages = "  ".join(f"{stage} {t['ms_per_call']:.2f}ms" for stage, t in row["stages"].items())
+        print(f"{row['video']:<28} {row['fps']:>7.1f} fps  rss {row['peak_rss_mb']:.0f} MB  {stages}")
+    total = suite["total"]
+    print(f"{'total':<28} {total['fps']:>7.1f} fps  {total['frames_processed']} frames in {total['seconds']:.2f}s")
+
+
+def _print_comparison(rows: List[Dict[str, Any]]) -> bool:
+    regressed = False
+    for row in rows:
+        regressed = regressed or bool(row["regressions"])
+        status = ("REGRESSION " + ",".join(row["regressions"])) if row["regressions"] else "ok"
+        print(f"{row['video']:<28} {row['fps_baseline']:>7.1f} -> {row['fps']:>7.1f} fps  {status}")
+    return regressed
+
+
+def _run_command(args: argparse.Namespace) -> int:
+    suite = run_suite(_sample_videos(args.videos), _env_cfg(), repeat=args.repeat)
+    _print_suite(suite)
+    if args.output:
+        Path(args.output).write_text(json.dumps(suite, indent=2), encoding="utf-8")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        return 1 if _print_comparison(compare_runs(baseline, suite, args.threshold)) else 0
+    return 0
+
+
+def _compare_command(args: argparse.Namespace) -> int:
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    return 1 if _print_comparison(compare_runs(baseline, current, args.threshold)) else 0
+
+
+def _hist_command(args: argparse.Namespace) -> int:
+    rows = compare_histograms(_sample_videos(args.videos), _env_cfg(), args.decimate)
+    for row in rows:
+        print(
+            f"{row['video']:<28} cuts {row['hard_cuts_reference']:>3} -> {row['hard_cuts_candidate']:>3}  "
+            f"{row['reference_ms_per_frame']:.3f} ms -> {row['candidate_ms_per_frame']:.3f} ms  "
+            f"{'ok' if row['match'] else 'MISMATCH'}"
+        )
+    if args.output:
+        Path(args.output).write_text(json.dumps(rows, indent=2), encoding="utf-8")
+    return 0 if all(row["match"] for row in rows) else 1
+
+
+def _parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="Benchmarks for the video feature extractor.")
+    sub = p.add_subparsers(dest="command", required=True)
+    hist = sub.add_parser("hist", help="Check that histogram decimation keeps shot-cut counts unchanged.")
+    hist.add_argument("videos", nargs="*")
+    hist.add_argument("--decimate", type=int, default=2)
+    hist.add_argument("--output")
+    hist.set_defaults(func=_hist_command)
+    run = sub.add_parser("run", help="Time the extractor end-to-end and per stage over the sample videos.")
+    run.add_argument("videos", nargs="*")
+    run.add_argument("--repeat", type=int, default=1, help="Runs per video; the fastest is kept.")
+    run.add_argument("--output", help="Write the results as a JSON baseline.")
+    run.add_argument("--baseline", help="Compare against a previous --output and exit 1 on regression.")
+    run.add_argument("--threshold", type=float, default=0.1)
+    run.set_defaults(func=_run_command)
+    compare = sub.add_parser("compare", help="Compare two saved run results.")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    compare.add_argument("--threshold", type=float, default=0.1)
+    compare.set_defaults(func=_compare_command)
+    return p
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = _parser().parse_args(argv)
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
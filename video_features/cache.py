@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import cv2
+
+from video_features.extractor import FeatureExtractionConfig
+
+# Settings that only change how an extraction is scheduled or instrumented, never the features it returns.
+EXECUTION_ONLY_FIELDS = frozenset({
+    "stage_timings",
+    "segments",
+    "segment_workers",
+    "pipeline",
+    "pipeline_queue_size",
+    "pipeline_text_workers",
+    "ocr_workers",
+    "decode_threads",
+    "reuse_buffers",
+})
+
+
+def result_key(content_digest: str, config: FeatureExtractionConfig) -> str:
+    excluded = EXECUTION_ONLY_FIELDS
+    seeded_flow = config.reuse_buffers and bool(config.farneback.flags & cv2.OPTFLOW_USE_INITIAL_FLOW)
+    if seeded_flow:
+        # Each segment seeds its flow from a zeroed field at the seam, so the split changes the motion figures.
+        excluded = excluded - {"segments", "segment_workers"}
+    fields = {k: v for k, v in asdict(config).items() if k not in excluded}
+    if not config.reuse_buffers:
+        # Without a persistent flow buffer the extractor drops this flag, so it must not split the key either.
+        fields["farneback"]["flags"] &= ~cv2.OPTFLOW_USE_INITIAL_FLOW
+    h = hashlib.blake2b(digest_size=32)
+    h.update(content_digest.encode("ascii"))
+    h.update(json.dumps(fields, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root: Path, max_bytes: int) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load_index()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                self._drop_locked(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return payload
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        data = json.dumps(result).encode("utf-8")
+        if len(data) > self.max_bytes:
+            return
+        fd, tmp_name = tempfile.mkstemp(dir=str(self.root), prefix="tmp_", suffix=".part")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_name, self._path(key))
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._bytes += len(data)
+            self._evict_locked()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _evict_locked(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            self._drop_locked(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.json"
+
+    def _drop_locked(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+
+    def _load_index(self) -> None:
+        found = []
+        for p in self.root.glob("*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            found.append((st.st_mtime, p.stem, st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._bytes += size
+        self._evict_locked()
@@ -1,9 +1,12 @@
 import argparse
 import json
+import sys
 from pathlib import Path
+from typing import Any, Dict, TextIO
 
+from video_features.batch import read_manifest, run_batch, scan_dir
 from video_features.extractor import FeatureExtractionConfig, VideoFeatureExtractor, FarnebackParams, HistogramParams
-from video_features.settings import ExtractorSettings
+from video_features.settings import AppSettings, ExtractorSettings
 
 
 def _env_cfg() -> FeatureExtractionConfig:
@@ -16,6 +19,28 @@ def _env_cfg() -> FeatureExtractionConfig:
         text_min_chars=e.text_min_chars,
         yolo_model=e.yolo_model,
         yolo_frame_stride=e.yolo_frame_stride,
+        seek_min_stride=e.seek_min_stride,
+        frame_source=e.frame_source,
+        decode_threads=e.decode_threads,
+        decode_keyframes_only=e.decode_keyframes_only,
+        yolo_batch_size=e.yolo_batch_size,
+        yolo_batch_max_bytes=e.yolo_batch_max_bytes,
+        pipeline=e.pipeline,
+        pipeline_queue_size=e.pipeline_queue_size,
+        pipeline_text_workers=e.pipeline_text_workers,
+        segments=e.segments,
+        segment_workers=e.segment_workers,
+        ocr_backend=e.ocr_backend,
+        ocr_workers=e.ocr_workers,
+        text_prefilter=e.text_prefilter,
+        text_prefilter_min_score=e.text_prefilter_min_score,
+        text_crop_regions=e.text_crop_regions,
+        text_early_exit=e.text_early_exit,
+        flow_width=e.flow_width,
+        reuse_buffers=e.reuse_buffers,
+        stage_timings=e.stage_timings,
+        motion_method=e.motion_method,
+        lk_grid_step=e.lk_grid_step,
         farneback=FarnebackParams(
             pyr_scale=e.farneback_pyr_scale,
             levels=e.farneback_levels,
@@ -25,14 +50,19 @@ def _env_cfg() -> FeatureExtractionConfig:
             poly_sigma=e.farneback_poly_sigma,
             flags=e.farneback_flags,
         ),
-        hist=HistogramParams(bins=e.histogram_bins, ranges=e.histogram_ranges),
+        hist=HistogramParams(bins=e.histogram_bins, ranges=e.histogram_ranges, decimate=e.histogram_decimate),
     )
 
 
 def _parser() -> argparse.ArgumentParser:
     p = argparse.ArgumentParser(description="Extract structural, temporal, and semantic video features.")
-    p.add_argument("--video", required=True)
-    p.add_argument("--output")
+    inputs = p.add_mutually_exclusive_group(required=True)
+    inputs.add_argument("--video")
+    inputs.add_argument("--input-dir", help="Process every video under this directory (recursively).")
+    inputs.add_argument("--manifest", help="Process the video paths listed one per line in this file.")
+    p.add_argument("--output", help="JSON output; with --input-dir/--manifest, the JSONL results file (required).")
+    p.add_argument("--workers", type=int, default=1, help="Worker processes for --input-dir/--manifest.")
+    p.add_argument("--per-frame", action="store_true", help="Stream one JSON line per processed frame, then a summary line.")
     p.add_argument("--frame-stride", type=int)
     p.add_argument("--resize-width", type=int)
     p.add_argument("--shot-threshold", type=float)
@@ -40,6 +70,24 @@ def _parser() -> argparse.ArgumentParser:
     p.add_argument("--text-min-chars", type=int)
     p.add_argument("--yolo-frame-stride", type=int)
     p.add_argument("--yolo-model")
+    p.add_argument("--seek-min-stride", type=int)
+    p.add_argument("--frame-source", choices=["opencv", "pyav", "ffmpeg"])
+    p.add_argument("--decode-threads", type=int)
+    p.add_argument("--keyframes-only", action="store_true", default=None)
+    p.add_argument("--yolo-batch-size", type=int)
+    p.add_argument("--pipeline", action="store_true", default=None)
+    p.add_argument("--pipeline-text-workers", type=int)
+    p.add_argument("--segments", type=int)
+    p.add_argument("--segment-workers", type=int)
+    p.add_argument("--ocr-backend", choices=["auto", "tesserocr", "pytesseract"])
+    p.add_argument("--ocr-workers", type=int)
+    p.add_argument("--text-prefilter", action="store_true", default=None)
+    p.add_argument("--text-crop-regions", action="store_true", default=None)
+    p.add_argument("--text-early-exit", action="store_true", default=None)
+    p.add_argument("--flow-width", type=int)
+    p.add_argument("--reuse-buffers", action="store_true", default=None)
+    p.add_argument("--stage-timings", action="store_true", default=None)
+    p.add_argument("--motion-method", choices=["farneback", "lk", "mvs"])
     return p
 
 
@@ -52,15 +100,62 @@ def _merge(base: FeatureExtractionConfig, args: argparse.Namespace) -> FeatureEx
         text_min_chars=args.text_min_chars if args.text_min_chars is not None else base.text_min_chars,
         yolo_frame_stride=args.yolo_frame_stride if args.yolo_frame_stride is not None else base.yolo_frame_stride,
         yolo_model=args.yolo_model if args.yolo_model is not None else base.yolo_model,
+        seek_min_stride=args.seek_min_stride if args.seek_min_stride is not None else base.seek_min_stride,
+        frame_source=args.frame_source if args.frame_source is not None else base.frame_source,
+        decode_threads=args.decode_threads if args.decode_threads is not None else base.decode_threads,
+        decode_keyframes_only=args.keyframes_only if args.keyframes_only is not None else base.decode_keyframes_only,
+        yolo_batch_size=args.yolo_batch_size if args.yolo_batch_size is not None else base.yolo_batch_size,
+        yolo_batch_max_bytes=base.yolo_batch_max_bytes,
+        pipeline=args.pipeline if args.pipeline is not None else base.pipeline,
+        pipeline_queue_size=base.pipeline_queue_size,
+        pipeline_text_workers=args.pipeline_text_workers if args.pipeline_text_workers is not None else base.pipeline_text_workers,
+        segments=args.segments if args.segments is not None else base.segments,
+        segment_workers=args.segment_workers if args.segment_workers is not None else base.segment_workers,
+        ocr_backend=args.ocr_backend if args.ocr_backend is not None else base.ocr_backend,
+        ocr_workers=args.ocr_workers if args.ocr_workers is not None else base.ocr_workers,
+        text_prefilter=args.text_prefilter if args.text_prefilter is not None else base.text_prefilter,
+        text_prefilter_min_score=base.text_prefilter_min_score,
+        text_crop_regions=args.text_crop_regions if args.text_crop_regions is not None else base.text_crop_regions,
+        text_early_exit=args.text_early_exit if args.text_early_exit is not None else base.text_early_exit,
+        flow_width=args.flow_width if args.flow_width is not None else base.flow_width,
+        reuse_buffers=args.reuse_buffers if args.reuse_buffers is not None else base.reuse_buffers,
+        stage_timings=args.stage_timings if args.stage_timings is not None else base.stage_timings,
+        motion_method=args.motion_method if args.motion_method is not None else base.motion_method,
+        lk_grid_step=base.lk_grid_step,
         farneback=base.farneback,
         hist=base.hist,
     )
 
 
+def _stream_per_frame(extractor: VideoFeatureExtractor, video: str, out: TextIO) -> None:
+    def write(record: Dict[str, Any]) -> None:
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+
+    features = extractor.extract_features(video, on_frame=write)
+    write({"summary": features})
+
+
 def main() -> None:
-    args = _parser().parse_args()
+    parser = _parser()
+    args = parser.parse_args()
     cfg = _merge(_env_cfg(), args)
+    if args.input_dir or args.manifest:
+        if not args.output:
+            parser.error("--output is required with --input-dir/--manifest")
+        if args.input_dir:
+            videos = scan_dir(Path(args.input_dir), AppSettings.load().allowed_extensions)
+        else:
+            videos = read_manifest(Path(args.manifest))
+        sys.exit(1 if run_batch(videos, cfg, Path(args.output), workers=args.workers) else 0)
     extractor = VideoFeatureExtractor(cfg)
+    if args.per_frame:
+        if args.output:
+            with open(args.output, "w", encoding="utf-8") as out:
+                _stream_per_frame(extractor, args.video, out)
+        else:
+            _stream_per_frame(extractor, args.video, sys.stdout)
+        return
     features = extractor.extract_features(args.video)
     print(json.dumps(features, indent=2))
     if args.output:
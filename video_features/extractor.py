@@ -1,13 +1,19 @@
 from __future__ import annotations
 
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, Tuple, Optional
+from typing import Any, Callable, Deque, Dict, List, Tuple, Optional
 
 import cv2
 import numpy as np
-import pytesseract
-from ultralytics import YOLO
+
+from video_features.frames import Frame, FrameSource, open_source
+from video_features.models import get_detector
+from video_features.ocr import crop_region, find_text_regions, get_ocr_backend
+from video_features.timing import StageTimer, TimedSource, totals
 
 
 @dataclass(frozen=True)
@@ -25,6 +31,7 @@ class FarnebackParams:
 class HistogramParams:
     bins: Tuple[int, int, int] = (8, 8, 8)
     ranges: Tuple[int, int, int, int, int, int] = (0, 180, 0, 256, 0, 256)
+    decimate: int = 1
 
 
 @dataclass(frozen=True)
@@ -36,107 +43,389 @@ class FeatureExtractionConfig:
     text_min_chars: int = 8
     yolo_model: str = "yolov8n.pt"
     yolo_frame_stride: int = 15
+    seek_min_stride: int = 0
+    frame_source: str = "opencv"
+    decode_threads: int = 0
+    decode_keyframes_only: bool = False
+    yolo_batch_size: int = 8
+    yolo_batch_max_bytes: int = 64 * 1024 * 1024
+    pipeline: bool = False
+    pipeline_queue_size: int = 8
+    pipeline_text_workers: int = 2
+    segments: int = 1
+    segment_workers: int = 0
+    ocr_backend: str = "auto"
+    ocr_workers: int = 2
+    text_prefilter: bool = False
+    text_prefilter_min_score: int = 8
+    text_crop_regions: bool = False
+    text_early_exit: bool = False
+    flow_width: int = 0
+    reuse_buffers: bool = False
+    stage_timings: bool = False
+    motion_method: str = "farneback"
+    lk_grid_step: int = 16
     farneback: FarnebackParams = field(default_factory=FarnebackParams)
     hist: HistogramParams = field(default_factory=HistogramParams)
 
 
+ProgressCallback = Callable[[Dict[str, Any]], None]
+FrameCallback = Callable[[Dict[str, Any]], None]
+
+PROGRESS_EVERY_FRAMES = 10
+
+# Per-line OCR only pays off for a few lines; past this many candidates a single full-frame call is cheaper.
+MAX_OCR_REGIONS = 3
+
+# Methods wrapped per stage when stage_timings is on; "decode" is timed around the frame source's iterator.
+TIMED_STAGES: Dict[str, Tuple[str, ...]] = {
+    "resize": ("_resize_to_width",),
+    "histogram": ("_hsv_histogram",),
+    "gray": ("_flow_gray",),
+    "flow": ("_motion_magnitude",),
+    "ocr": ("_sample_text",),
+    "yolo": ("_count_people_vs_objects_batch",),
+}
+
+
+class _DetectionBatch:
+    def __init__(self) -> None:
+        self.indices: List[int] = []
+        self.frames: List[np.ndarray] = []
+        self.nbytes = 0
+
+    def add(self, index: int, frame_bgr: np.ndarray) -> None:
+        self.indices.append(index)
+        self.frames.append(frame_bgr)
+        self.nbytes += frame_bgr.nbytes
+
+    def take(self) -> Tuple[List[int], List[np.ndarray]]:
+        indices, frames = self.indices, self.frames
+        self.indices, self.frames, self.nbytes = [], [], 0
+        return indices, frames
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+
+class _FrameBuffers:
+    def __init__(self) -> None:
+        self._arrays: Dict[str, np.ndarray] = {}
+
+    def get(self, name: str, shape: Tuple[int, ...], dtype: Any = np.uint8) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None or array.shape != shape or array.dtype != dtype:
+            # Sized from the first frame; only a resolution change mid-stream reallocates.
+            array = np.zeros(shape, dtype=dtype)
+            self._arrays[name] = array
+        return array
+
+
+@dataclass
+class _RunState:
+    started: float = field(default_factory=time.perf_counter)
+    processed_frames: int = 0
+    hard_cuts: int = 0
+    text_samples: int = 0
+    text_positives: int = 0
+    text_ocr_skipped: int = 0
+    motion_samples: int = 0
+    motion_magnitude_sum: float = 0.0
+    person_total: int = 0
+    object_total: int = 0
+    prev_hist: Optional[np.ndarray] = None
+    prev_gray: Optional[np.ndarray] = None
+    buffers: Optional[_FrameBuffers] = None
+    on_frame: Optional[FrameCallback] = None
+    fps: float = 0.0
+    frame_records: Deque[Tuple[Dict[str, Any], Optional["Future[Tuple[bool, bool]]"], bool]] = field(default_factory=deque)
+    detected: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+    timings: Optional[Dict[str, List[Any]]] = None
+    batch: _DetectionBatch = field(default_factory=_DetectionBatch)
+    text_pending: Deque["Future[Tuple[bool, bool]]"] = field(default_factory=deque)
+    detection_pending: Deque["Future[List[Tuple[int, Tuple[int, int]]]]"] = field(default_factory=deque)
+
+    def absorb(self, other: "_RunState") -> None:
+        self.processed_frames += other.processed_frames
+        self.hard_cuts += other.hard_cuts
+        self.text_samples += other.text_samples
+        self.text_positives += other.text_positives
+        self.text_ocr_skipped += other.text_ocr_skipped
+        self.motion_samples += other.motion_samples
+        self.motion_magnitude_sum += other.motion_magnitude_sum
+        self.person_total += other.person_total
+        self.object_total += other.object_total
+
+
+def _submit(executor: Optional[Executor], fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    if executor is not None:
+        return executor.submit(fn, *args, **kwargs)
+    done: Future = Future()
+    done.set_result(fn(*args, **kwargs))
+    return done
+
+
 class VideoFeatureExtractor:
     def __init__(self, config: Optional[FeatureExtractionConfig] = None) -> None:
         self.config = config or FeatureExtractionConfig()
-        self.detector = YOLO(self.config.yolo_model)
+        self.detector = get_detector(self.config.yolo_model)
+        self.ocr = get_ocr_backend(self.config.ocr_backend, self.config.ocr_workers)
+        self.timer: Optional[StageTimer] = None
+        if self.config.stage_timings:
+            # Instance attributes shadow the methods only when enabled, so disabled runs pay nothing.
+            self.timer = StageTimer()
+            for stage, names in TIMED_STAGES.items():
+                for name in names:
+                    setattr(self, name, self.timer.wrap(stage, getattr(self, name)))
+
+    def extract_features(
+        self,
+        video_path: str | Path,
+        progress: Optional[ProgressCallback] = None,
+        on_frame: Optional[FrameCallback] = None,
+    ) -> Dict[str, Any]:
+        if self.timer is None:
+            return self._extract(Path(video_path), progress, on_frame)
+        self.timer.reset()
+        features = self._extract(Path(video_path), progress, on_frame)
+        totals.merge(self.timer.snapshot())
+        features["timings"] = self.timer.report()
+        return features
 
-    def extract_features(self, video_path: str | Path) -> Dict[str, Any]:
-        video_file = Path(video_path)
+    def _extract(
+        self,
+        video_file: Path,
+        progress: Optional[ProgressCallback],
+        on_frame: Optional[FrameCallback],
+    ) -> Dict[str, Any]:
         if not video_file.exists():
             raise FileNotFoundError(f"Video not found: {video_file}")
 
-        cap = cv2.VideoCapture(str(video_file))
-        if not cap.isOpened():
-            raise ValueError(f"Unable to open video: {video_file}")
+        # Per-frame records come from a single in-order pass, so segment workers are not used for them. Keyframe-only
+        # decoding has no stride cadence to prime a seam from, so it is never segmented either.
+        if self.config.segments > 1 and on_frame is None and not self.config.decode_keyframes_only:
+            from video_features.segments import run_segmented
 
-        fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
-        duration_seconds = (total_frames / fps) if fps > 0 else None
+            return run_segmented(self, video_file, progress=progress)
+
+        return self._extract_sequential(video_file, progress, on_frame)
 
-        absolute_frame_index = -1
-        processed_frames = 0
-        hard_cuts = 0
-        text_samples = 0
-        text_positives = 0
-        motion_samples = 0
-        motion_magnitude_sum = 0.0
-        person_total = 0
-        object_total = 0
+    def _extract_sequential(
+        self,
+        video_file: Path,
+        progress: Optional[ProgressCallback],
+        on_frame: Optional[FrameCallback],
+    ) -> Dict[str, Any]:
+        if self.config.pipeline:
+            from video_features.pipeline import run_pipelined
 
-        prev_hist: Optional[np.ndarray] = None
-        prev_gray: Optional[np.ndarray] = None
+            return run_pipelined(self, video_file, progress=progress, on_frame=on_frame)
 
+        state = _RunState(on_frame=on_frame)
+        text_pool = ThreadPoolExecutor(self.config.ocr_workers, thread_name_prefix="vf-text") if self.config.ocr_workers > 1 else None
         try:
-            while True:
-                ok, frame_bgr = cap.read()
-                if not ok:
-                    break
-
-                absolute_frame_index += 1
-                if (absolute_frame_index % self.config.frame_stride) != 0:
-                    continue
-
-                processed_frames += 1
-                frame_small_bgr = self._resize_to_width(frame_bgr, self.config.resize_width)
-
-                curr_hist = self._hsv_histogram(frame_small_bgr)
-                if prev_hist is not None:
-                    color_distance = self._bhattacharyya(prev_hist, curr_hist)
-                    if color_distance > self.config.shot_threshold:
-                        hard_cuts += 1
-                prev_hist = curr_hist
-
-                curr_gray = cv2.cvtColor(frame_small_bgr, cv2.COLOR_BGR2GRAY)
-                if prev_gray is not None:
-                    avg_mag = self._avg_optical_flow_magnitude(prev_gray, curr_gray)
-                    motion_magnitude_sum += avg_mag
-                    motion_samples += 1
-                prev_gray = curr_gray
-
-                if (processed_frames % self.config.text_sample_stride) == 0:
-                    text_samples += 1
-                    if self._contains_text(frame_small_bgr, min_chars=self.config.text_min_chars):
-                        text_positives += 1
-
-                if (processed_frames % self.config.yolo_frame_stride) == 0:
-                    persons, objects = self._count_people_vs_objects(frame_small_bgr)
-                    person_total += persons
-                    object_total += objects
+            with self._open_source(video_file) as source:
+                state.fps = source.fps
+                for frame in source:
+                    self._observe(state, frame, text_executor=text_pool)
+                    self._report(progress, state, source.total_frames)
+                self._drain(state)
+                self._report(progress, state, source.total_frames, force=True)
+                return self._summarize(video_file, source, state)
         finally:
-            cap.release()
+            if text_pool is not None:
+                text_pool.shutdown(wait=True)
+
+    def _report(self, progress: Optional[ProgressCallback], state: _RunState, total_frames: int, force: bool = False) -> None:
+        if progress is None:
+            return
+        if force or (state.processed_frames % PROGRESS_EVERY_FRAMES) == 0:
+            expected = -(-total_frames // self.config.frame_stride) if total_frames > 0 else None
+            elapsed = time.perf_counter() - state.started
+            rate = state.processed_frames / elapsed if elapsed > 0 else 0.0
+            eta = max(0, expected - state.processed_frames) / rate if expected is not None and rate > 0 else None
+            progress({
+                "frames_processed": state.processed_frames,
+                "frames_expected": expected,
+                "frames_total": total_frames,
+                "elapsed_seconds": elapsed,
+                "frames_per_second": rate,
+                "eta_seconds": eta,
+                "partial": self._aggregates(state),
+            })
+
+    def _open_source(self, video_file: Path, start: int = 0, end: Optional[int] = None) -> FrameSource:
+        source = open_source(
+            video_file,
+            stride=self.config.frame_stride,
+            seek_min_stride=self.config.seek_min_stride,
+            start=start,
+            end=end,
+            backend=self.config.frame_source,
+            export_mvs=self.config.motion_method == "mvs",
+            output_width=self.config.resize_width,
+            threads=self.config.decode_threads,
+            keyframes_only=self.config.decode_keyframes_only,
+        )
+        return TimedSource(source, self.timer) if self.timer is not None else source
+
+    def _prime(self, state: _RunState, frame: Frame) -> None:
+        frame_small_bgr = self._resize_to_width(frame.image, self.config.resize_width)
+        state.prev_hist = self._hsv_histogram(frame_small_bgr)
+        state.prev_gray = self._flow_gray(frame_small_bgr)
 
-        avg_motion = (motion_magnitude_sum / motion_samples) if motion_samples else 0.0
-        text_ratio = (text_positives / text_samples) if text_samples else 0.0
-        person_object_ratio = (person_total / object_total) if object_total else None
+    def _observe(
+        self,
+        state: _RunState,
+        frame: Frame,
+        text_executor: Optional[Executor] = None,
+        detection_executor: Optional[Executor] = None,
+    ) -> None:
+        state.processed_frames += 1
+        if self.config.reuse_buffers and state.buffers is None:
+            state.buffers = _FrameBuffers()
+        buffers = state.buffers
+        frame_small_bgr = self._resize_to_width(frame.image, self.config.resize_width, buffers=buffers)
+
+        curr_hist = self._hsv_histogram(frame_small_bgr, buffers=buffers)
+        color_distance: Optional[float] = None
+        if state.prev_hist is not None:
+            color_distance = self._bhattacharyya(state.prev_hist, curr_hist)
+            if color_distance > self.config.shot_threshold:
+                state.hard_cuts += 1
+        state.prev_hist = curr_hist
+
+        # Alternate two gray buffers so the previous frame survives until the flow against it is computed.
+        curr_gray = self._flow_gray(frame_small_bgr, buffers=buffers, slot=state.processed_frames % 2)
+        avg_mag: Optional[float] = None
+        if frame.motion is not None:
+            # Codec vectors are in decoded-image pixels; rescale to the analysis width like the flow estimators.
+            avg_mag = frame.motion * (frame_small_bgr.shape[1] / float(frame.image.shape[1]))
+        elif state.prev_gray is not None:
+            avg_mag = self._motion_magnitude(state.prev_gray, curr_gray, frame_small_bgr.shape[1], buffers=buffers)
+        if avg_mag is not None:
+            state.motion_magnitude_sum += avg_mag
+            state.motion_samples += 1
+        state.prev_gray = curr_gray
+
+        sample_text = (state.processed_frames % self.config.text_sample_stride) == 0
+        sample_objects = (state.processed_frames % self.config.yolo_frame_stride) == 0
+        shared = frame.borrowed if frame_small_bgr is frame.image else buffers is not None
+        if shared and (sample_objects or (sample_text and text_executor is not None)):
+            frame_small_bgr = frame_small_bgr.copy()
+
+        if sample_text:
+            state.text_samples += 1
+            state.text_pending.append(
+                _submit(text_executor, self._sample_text, frame_small_bgr, min_chars=self.config.text_min_chars)
+            )
+
+        if sample_objects:
+            state.batch.add(frame.index, frame_small_bgr)
+            if self._batch_full(state.batch):
+                state.detection_pending.append(_submit(detection_executor, self._flush_detections, *state.batch.take()))
+
+        if state.on_frame is not None:
+            record = {
+                "frame_index": frame.index,
+                "timestamp": frame.index / state.fps if state.fps > 0 else None,
+                "hist_distance": color_distance,
+                "motion_magnitude": avg_mag,
+            }
+            state.frame_records.append((record, state.text_pending[-1] if sample_text else None, sample_objects))
+
+        self._reap(state, max_pending=self.config.pipeline_queue_size)
+        self._emit_frames(state)
+
+    def _reap(self, state: _RunState, max_pending: int) -> None:
+        while state.text_pending and (state.text_pending[0].done() or len(state.text_pending) > max_pending):
+            present, skipped = state.text_pending.popleft().result()
+            state.text_positives += int(present)
+            state.text_ocr_skipped += int(skipped)
+        while state.detection_pending and (state.detection_pending[0].done() or len(state.detection_pending) > max_pending):
+            for index, (persons, objects) in state.detection_pending.popleft().result():
+                state.person_total += persons
+                state.object_total += objects
+                if state.on_frame is not None:
+                    state.detected[index] = (persons, objects)
+
+    def _emit_frames(self, state: _RunState) -> None:
+        # Records leave in frame order once their OCR and YOLO samples have resolved; at most one YOLO batch waits.
+        while state.frame_records and state.on_frame is not None:
+            record, text, sampled_objects = state.frame_records[0]
+            if (text is not None and not text.done()) or (sampled_objects and record["frame_index"] not in state.detected):
+                return
+            state.frame_records.popleft()
+            if text is not None:
+                record["text_present"], record["text_ocr_skipped"] = text.result()
+            if sampled_objects:
+                record["people"], record["objects"] = state.detected.pop(record["frame_index"])
+            state.on_frame(record)
+
+    def _drain(self, state: _RunState, detection_executor: Optional[Executor] = None) -> None:
+        if state.batch:
+            state.detection_pending.append(_submit(detection_executor, self._flush_detections, *state.batch.take()))
+        self._reap(state, max_pending=0)
+        self._emit_frames(state)
+
+    def _summarize(self, video_file: Path, source: FrameSource, state: _RunState) -> Dict[str, Any]:
+        fps = source.fps
+        total_frames = source.total_frames
+        duration_seconds = (total_frames / fps) if fps > 0 else None
 
         return {
             "video_path": str(video_file.resolve()),
             "duration_seconds": duration_seconds,
             "frames_total": total_frames,
-            "frames_processed": processed_frames,
-            "hard_cuts": hard_cuts,
+            "frames_processed": state.processed_frames,
+            **self._aggregates(state),
+        }
+
+    @staticmethod
+    def _aggregates(state: _RunState) -> Dict[str, Any]:
+        avg_motion = (state.motion_magnitude_sum / state.motion_samples) if state.motion_samples else 0.0
+        # Mid-run, OCR samples still in flight have no verdict yet and are left out of the ratio.
+        text_resolved = state.text_samples - len(state.text_pending)
+        text_ratio = (state.text_positives / text_resolved) if text_resolved else 0.0
+        person_object_ratio = (state.person_total / state.object_total) if state.object_total else None
+
+        return {
+            "hard_cuts": state.hard_cuts,
             "avg_motion_magnitude": avg_motion,
             "text_present_ratio": text_ratio,
-            "people_detections": person_total,
-            "object_detections": object_total,
+            "text_ocr_skipped": state.text_ocr_skipped,
+            "people_detections": state.person_total,
+            "object_detections": state.object_total,
             "person_to_object_ratio": person_object_ratio,
         }
 
-    def _resize_to_width(self, frame_bgr: np.ndarray, target_w: int) -> np.ndarray:
+    def _resize_to_width(
+        self, frame_bgr: np.ndarray, target_w: int, buffers: Optional[_FrameBuffers] = None, name: str = "small"
+    ) -> np.ndarray:
         h, w = frame_bgr.shape[:2]
         if w <= target_w:
             return frame_bgr
         scale = target_w / float(w)
         new_size = (target_w, int(h * scale))
-        return cv2.resize(frame_bgr, new_size, interpolation=cv2.INTER_AREA)
+        if buffers is None:
+            return cv2.resize(frame_bgr, new_size, interpolation=cv2.INTER_AREA)
+        dst = buffers.get(name, (new_size[1], new_size[0]) + frame_bgr.shape[2:])
+        return cv2.resize(frame_bgr, new_size, dst=dst, interpolation=cv2.INTER_AREA)
 
-    def _hsv_histogram(self, frame_bgr: np.ndarray) -> np.ndarray:
-        hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
+    def _hsv_histogram(self, frame_bgr: np.ndarray, buffers: Optional[_FrameBuffers] = None) -> np.ndarray:
+        step = self.config.hist.decimate
+        if step > 1:
+            # Nearest-neighbour decimation keeps the pixel value distribution; only the sample count shrinks.
+            if buffers is None:
+                frame_bgr = np.ascontiguousarray(frame_bgr[::step, ::step])
+            else:
+                decimated = frame_bgr[::step, ::step]
+                frame_bgr = buffers.get("decimated", decimated.shape)
+                np.copyto(frame_bgr, decimated)
+        if buffers is None:
+            hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV)
+        else:
+            hsv = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2HSV, dst=buffers.get("hsv", frame_bgr.shape))
         hist = cv2.calcHist(
             images=[hsv],
             channels=[0, 1, 2],
@@ -151,24 +440,88 @@ class VideoFeatureExtractor:
     def _bhattacharyya(h1: np.ndarray, h2: np.ndarray) -> float:
         return float(cv2.compareHist(h1, h2, cv2.HISTCMP_BHATTACHARYYA))
 
-    def _avg_optical_flow_magnitude(self, prev_gray: np.ndarray, curr_gray: np.ndarray) -> float:
+    def _flow_gray(self, frame_bgr: np.ndarray, buffers: Optional[_FrameBuffers] = None, slot: int = 0) -> np.ndarray:
+        if buffers is None:
+            gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
+            if self.config.flow_width > 0:
+                gray = self._resize_gray(gray)
+            return gray
+        narrow = 0 < self.config.flow_width < frame_bgr.shape[1]
+        name = "gray" if narrow else f"gray{slot}"
+        gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY, dst=buffers.get(name, frame_bgr.shape[:2]))
+        if narrow:
+            gray = self._resize_gray(gray, buffers=buffers, name=f"gray{slot}")
+        return gray
+
+    def _resize_gray(self, gray: np.ndarray, buffers: Optional[_FrameBuffers] = None, name: str = "gray") -> np.ndarray:
+        # Bypasses the timed wrapper so the flow-width downscale is booked under "gray", not again under "resize".
+        return VideoFeatureExtractor._resize_to_width(self, gray, self.config.flow_width, buffers=buffers, name=name)
+
+    def _motion_magnitude(
+        self, prev_gray: np.ndarray, curr_gray: np.ndarray, frame_w: int, buffers: Optional[_FrameBuffers] = None
+    ) -> float:
+        if self.config.motion_method == "lk":
+            mag = self._avg_sparse_flow_magnitude(prev_gray, curr_gray)
+        else:
+            mag = self._avg_optical_flow_magnitude(prev_gray, curr_gray, buffers=buffers)
+        # Displacements measured on a narrower flow image are scaled back to resize_width pixels.
+        return mag * (frame_w / float(curr_gray.shape[1]))
+
+    def _avg_sparse_flow_magnitude(self, prev_gray: np.ndarray, curr_gray: np.ndarray) -> float:
+        h, w = prev_gray.shape[:2]
+        step = max(4, self.config.lk_grid_step)
+        # Strongest corners at least one grid cell apart: roughly one tracked point per cell where there is texture.
+        points = cv2.goodFeaturesToTrack(prev_gray, maxCorners=(h // step) * (w // step), qualityLevel=0.01, minDistance=step)
+        if points is None:
+            return 0.0
+        p = self.config.farneback
+        lk = dict(winSize=(p.winsize, p.winsize), maxLevel=p.levels)
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, curr_gray, points, None, **lk)
+        back, back_status, _ = cv2.calcOpticalFlowPyrLK(curr_gray, prev_gray, moved, None, **lk)
+        # Forward-backward check drops tracks that jumped across a cut or onto a flat region.
+        consistent = np.linalg.norm((back - points).reshape(-1, 2), axis=1) < 1.0
+        tracked = (status.ravel() == 1) & (back_status.ravel() == 1) & consistent
+        if not tracked.any():
+            return 0.0
+        delta = (moved - points).reshape(-1, 2)[tracked]
+        return float(np.mean(np.hypot(delta[:, 0], delta[:, 1])))
+
+    def _avg_optical_flow_magnitude(
+        self, prev_gray: np.ndarray, curr_gray: np.ndarray, buffers: Optional[_FrameBuffers] = None
+    ) -> float:
         p = self.config.farneback
+        flags = p.flags
+        if buffers is None:
+            flow = None
+            # There is no previous field to start from without a persistent flow buffer.
+            flags &= ~cv2.OPTFLOW_USE_INITIAL_FLOW
+        else:
+            h, w = curr_gray.shape[:2]
+            # New buffers start zeroed, so OPTFLOW_USE_INITIAL_FLOW starts from rest and then from the last field.
+            flow = buffers.get("flow", (h, w, 2), np.float32)
         flow = cv2.calcOpticalFlowFarneback(
             prev=prev_gray,
             next=curr_gray,
-            flow=None,
+            flow=flow,
             pyr_scale=p.pyr_scale,
             levels=p.levels,
             winsize=p.winsize,
             iterations=p.iterations,
             poly_n=p.poly_n,
             poly_sigma=p.poly_sigma,
-            flags=p.flags,
+            flags=flags,
         )
-        mag, _ = cv2.cartToPolar(flow[..., 0], flow[..., 1])
-        return float(np.mean(mag))
+        if buffers is None:
+            mag, _ = cv2.cartToPolar(flow[..., 0], flow[..., 1])
+            return float(np.mean(mag))
+        h, w = flow.shape[:2]
+        fx = cv2.extractChannel(flow, 0, dst=buffers.get("flow_x", (h, w), np.float32))
+        fy = cv2.extractChannel(flow, 1, dst=buffers.get("flow_y", (h, w), np.float32))
+        # Only the length is used, so skip cartToPolar's angle plane.
+        mag = cv2.magnitude(fx, fy, magnitude=buffers.get("flow_mag", (h, w), np.float32))
+        return float(cv2.mean(mag)[0])
 
-    def _contains_text(self, frame_bgr: np.ndarray, min_chars: int) -> bool:
+    def _sample_text(self, frame_bgr: np.ndarray, min_chars: int) -> Tuple[bool, bool]:
         gray = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2GRAY)
         blur = cv2.GaussianBlur(gray, (5, 5), 0)
         binary = cv2.adaptiveThreshold(
@@ -179,12 +532,37 @@ class VideoFeatureExtractor:
             blockSize=11,
             C=2,
         )
-        data = pytesseract.image_to_data(binary, output_type=pytesseract.Output.DICT)
-        text = "".join(data.get("text", [])).strip()
-        return len(text) >= min_chars
+        if not (self.config.text_prefilter or self.config.text_crop_regions or self.config.text_early_exit):
+            return len(self.ocr.read_text(binary)) >= min_chars, False
+        regions = find_text_regions(binary, blur)
+        # Regions come best line first; one convincing line is evidence of text, many weak ones are usually texture.
+        if self.config.text_prefilter and (not regions or regions[0].score < self.config.text_prefilter_min_score):
+            return False, True
+        if len(regions) > MAX_OCR_REGIONS:
+            return len(self.ocr.read_text(binary)) >= min_chars, False
+        if self.config.text_early_exit and regions:
+            chars = 0
+            for region in regions:
+                chars += len(self.ocr.read_text(crop_region(binary, region), single_line=True))
+                if chars >= min_chars:
+                    return True, False
+            return False, False
+        if not self.config.text_crop_regions or not regions:
+            return len(self.ocr.read_text(binary)) >= min_chars, False
+        chars = sum(len(self.ocr.read_text(crop_region(binary, r))) for r in regions)
+        return chars >= min_chars, False
+
+    def _batch_full(self, batch: _DetectionBatch) -> bool:
+        return len(batch) >= max(1, self.config.yolo_batch_size) or batch.nbytes >= self.config.yolo_batch_max_bytes
+
+    def _flush_detections(self, indices: List[int], frames_bgr: List[np.ndarray]) -> List[Tuple[int, Tuple[int, int]]]:
+        return list(zip(indices, self._count_people_vs_objects_batch(frames_bgr)))
+
+    def _count_people_vs_objects_batch(self, frames_bgr: List[np.ndarray]) -> List[Tuple[int, int]]:
+        results = self.detector(frames_bgr, verbose=False)
+        return [self._tally_detections(result) for result in results]
 
-    def _count_people_vs_objects(self, frame_bgr: np.ndarray) -> Tuple[int, int]:
-        result = self.detector(frame_bgr, verbose=False)[0]
+    def _tally_detections(self, result: Any) -> Tuple[int, int]:
         names = getattr(result, "names", getattr(self.detector, "names", {})) or {}
         people, others = 0, 0
         if not hasattr(result, "boxes") or result.boxes is None:
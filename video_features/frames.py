@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Iterator, NamedTuple, Optional, Protocol
+
+import cv2
+import numpy as np
+
+try:
+    import av
+except ImportError:
+    av = None
+
+
+class Frame(NamedTuple):
+    index: int
+    image: np.ndarray
+    motion: Optional[float] = None
+    # The image is a view into a buffer the source overwrites on the next frame; copy it before retaining.
+    borrowed: bool = False
+
+
+class FrameSource(Protocol):
+    fps: float
+    total_frames: int
+
+    def __iter__(self) -> Iterator[Frame]: ...
+
+    def close(self) -> None: ...
+
+    def __enter__(self) -> "FrameSource": ...
+
+    def __exit__(self, *exc: object) -> None: ...
+
+
+class CvFrameSource:
+    def __init__(
+        self,
+        video_path: str | Path,
+        stride: int = 1,
+        seek_min_stride: int = 0,
+        start: int = 0,
+        end: Optional[int] = None,
+    ) -> None:
+        self.video_path = Path(video_path)
+        self.stride = max(1, stride)
+        self.seek_min_stride = seek_min_stride
+        self.start = max(0, start)
+        self.end = end
+        self.cap = cv2.VideoCapture(str(self.video_path))
+        if not self.cap.isOpened():
+            raise ValueError(f"Unable to open video: {self.video_path}")
+        self.fps = float(self.cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        self.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+    @property
+    def stop(self) -> Optional[int]:
+        if self.end is None:
+            return self.total_frames or None
+        return min(self.end, self.total_frames) if self.total_frames else self.end
+
+    @property
+    def seeking(self) -> bool:
+        return self.seek_min_stride > 0 and self.stride >= self.seek_min_stride and self.stop is not None
+
+    def __iter__(self) -> Iterator[Frame]:
+        return self._seek_frames() if self.seeking else self._grab_frames()
+
+    def _grab_frames(self) -> Iterator[Frame]:
+        index = self.start - 1
+        if self.start:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.start)
+        while self.end is None or index + 1 < self.end:
+            if not self.cap.grab():
+                break
+            index += 1
+            if (index % self.stride) != 0:
+                continue
+            ok, image = self.cap.retrieve()
+            if not ok:
+                break
+            yield Frame(index, image)
+
+    def _seek_frames(self) -> Iterator[Frame]:
+        # Each seek decodes forward from the nearest keyframe, so this only pays off for strides spanning a GOP.
+        first = -(-self.start // self.stride) * self.stride
+        for index in range(first, self.stop or 0, self.stride):
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, index)
+            ok, image = self.cap.read()
+            if not ok:
+                break
+            yield Frame(index, image)
+
+    def close(self) -> None:
+        self.cap.release()
+
+    def __enter__(self) -> "CvFrameSource":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _mean_motion_vector_magnitude(frame: Any) -> Optional[float]:
+    side = frame.side_data.get("MOTION_VECTORS")
+    if side is None:
+        return None
+    mvs = side.to_ndarray()
+    # B-frames carry future references too; past-only keeps one vector per block, like forward optical flow.
+    mvs = mvs[mvs["source"] < 0]
+    if mvs.size == 0:
+        return 0.0
+    scale = np.maximum(mvs["motion_scale"].astype(np.float64), 1.0)
+    magnitude = np.hypot(mvs["motion_x"], mvs["motion_y"]) / scale
+    area = mvs["w"].astype(np.float64) * mvs["h"]
+    # Blocks without vectors (skipped/intra) count as static, matching a dense per-pixel mean.
+    return float(np.sum(magnitude * area) / float(frame.width * frame.height))
+
+
+class PyAvFrameSource:
+    def __init__(
+        self,
+        video_path: str | Path,
+        stride: int = 1,
+        start: int = 0,
+        end: Optional[int] = None,
+        export_mvs: bool = False,
+        output_width: int = 0,
+        threads: int = 0,
+        keyframes_only: bool = False,
+    ) -> None:
+        if av is None:
+            raise RuntimeError("PyAV is required for this frame source; install the 'av' package.")
+        self.video_path = Path(video_path)
+        self.stride = max(1, stride)
+        self.start = max(0, start)
+        self.end = end
+        self.export_mvs = export_mvs and not keyframes_only
+        self.output_width = output_width
+        self.keyframes_only = keyframes_only
+        try:
+            self.container = av.open(str(self.video_path))
+        except (OSError, ValueError) as exc:
+            raise ValueError(f"Unable to open video: {self.video_path}") from exc
+        if not self.container.streams.video:
+            self.container.close()
+            raise ValueError(f"Unable to open video: {self.video_path}")
+        self.stream = self.container.streams.video[0]
+        codec = self.stream.codec_context
+        codec.thread_type = "AUTO"
+        codec.thread_count = max(0, threads)
+        if keyframes_only:
+            codec.skip_frame = "NONKEY"
+        if self.export_mvs:
+            codec.options = {"flags2": "+export_mvs"}
+        self.fps = float(self.stream.average_rate or 0.0)
+        self.total_frames = int(self.stream.frames or 0) or self._estimate_frames()
+
+    def __iter__(self) -> Iterator[Frame]:
+        # Motion since the previous kept frame: per-frame codec vectors are one-frame displacements, so the
+        # stride-apart displacement Farneback would measure is approximated by their sum.
+        motion: Optional[float] = 0.0
+        index: Optional[int] = None if self._seek_to_start() else -1
+        for frame in self.container.decode(self.stream):
+            if self.keyframes_only or index is None:
+                index = self._pts_index(frame, index)
+            else:
+                index += 1
+            if self.end is not None and index >= self.end:
+                break
+            if self.keyframes_only:
+                if index >= self.start:
+                    yield Frame(index, self._to_bgr(frame))
+                continue
+            if self.export_mvs and motion is not None:
+                frame_motion = _mean_motion_vector_magnitude(frame)
+                motion = None if frame_motion is None else motion + frame_motion
+            if (index % self.stride) != 0:
+                continue
+            if index >= self.start:
+                image = self._to_bgr(frame)
+                if self.export_mvs and motion is not None:
+                    motion *= image.shape[1] / float(frame.width)
+                yield Frame(index, image, motion if self.export_mvs else None)
+            motion = 0.0
+
+    def _estimate_frames(self) -> int:
+        # Many MP4s carry no nb_frames; derive the count from the duration like OpenCV does, preferring the
+        # stream's own duration over the container's.
+        if self.fps <= 0:
+            return 0
+        if self.stream.duration and self.stream.time_base:
+            seconds = float(self.stream.duration * self.stream.time_base)
+        elif self.container.duration:
+            seconds = self.container.duration / float(av.time_base)
+        else:
+            return 0
+        return int(round(seconds * self.fps))
+
+    def _seek_to_start(self) -> bool:
+        if self.start <= 0 or self.fps <= 0 or not self.stream.time_base:
+            return False
+        offset = int(self.start / self.fps / self.stream.time_base) + (self.stream.start_time or 0)
+        self.container.seek(offset, stream=self.stream, backward=True)
+        return True
+
+    def _pts_index(self, frame: Any, previous: Optional[int]) -> int:
+        if frame.pts is None or self.fps <= 0:
+            return (previous if previous is not None else -1) + 1
+        seconds = float((frame.pts - (self.stream.start_time or 0)) * self.stream.time_base)
+        return int(round(seconds * self.fps))
+
+    def _to_bgr(self, frame: Any) -> np.ndarray:
+        if self.output_width <= 0 or frame.width <= self.output_width:
+            return frame.to_ndarray(format="bgr24")
+        # Let swscale shrink while converting so the full-resolution BGR frame is never materialized.
+        height = int(frame.height * (self.output_width / float(frame.width)))
+        return frame.to_ndarray(format="bgr24", width=self.output_width, height=height, interpolation="AREA")
+
+    def close(self) -> None:
+        self.container.close()
+
+    def __enter__(self) -> "PyAvFrameSource":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+class FfmpegFrameSource:
+    def __init__(
+        self,
+        video_path: str | Path,
+        stride: int = 1,
+        start: int = 0,
+        end: Optional[int] = None,
+        output_width: int = 0,
+        threads: int = 0,
+        ffmpeg: str = "ffmpeg",
+    ) -> None:
+        self.video_path = Path(video_path)
+        self.stride = max(1, stride)
+        self.start = max(0, start)
+        self.end = end
+        self.threads = threads
+        self.ffmpeg = shutil.which(ffmpeg)
+        if self.ffmpeg is None:
+            raise RuntimeError(f"Frame source 'ffmpeg' requested but '{ffmpeg}' was not found on PATH.")
+        # Container metadata only; OpenCV's probe is cheaper than spawning ffprobe and needs no extra binary.
+        cap = cv2.VideoCapture(str(self.video_path))
+        if not cap.isOpened():
+            raise ValueError(f"Unable to open video: {self.video_path}")
+        self.fps = float(cap.get(cv2.CAP_PROP_FPS) or 0.0)
+        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        src_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH) or 0)
+        src_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT) or 0)
+        cap.release()
+        if src_w <= 0 or src_h <= 0:
+            raise ValueError(f"Unable to open video: {self.video_path}")
+        self.scaled = 0 < output_width < src_w
+        if self.scaled:
+            self.width, self.height = output_width, int(src_h * (output_width / float(src_w)))
+        else:
+            self.width, self.height = src_w, src_h
+        self.proc: Optional[subprocess.Popen[bytes]] = None
+        self.stderr: Optional[Any] = None
+
+    def _command(self, first: int) -> list[str]:
+        cmd = [self.ffmpeg or "ffmpeg", "-nostdin", "-v", "error"]
+        if self.threads > 0:
+            cmd += ["-threads", str(self.threads)]
+        if first > 0 and self.fps > 0:
+            # Input seeking decodes from the previous keyframe and drops frames before the timestamp; half a frame
+            # of slack keeps frame `first` itself.
+            cmd += ["-ss", f"{(first - 0.5) / self.fps:.6f}"]
+        cmd += ["-i", str(self.video_path), "-map", "0:v:0"]
+        filters = []
+        if self.stride > 1:
+            filters.append(f"select=not(mod(n\\,{self.stride}))")
+        if self.scaled:
+            filters.append(f"scale={self.width}:{self.height}:flags=area")
+        if filters:
+            cmd += ["-vf", ",".join(filters)]
+        cmd += ["-fps_mode", "passthrough"]
+        if self.end is not None:
+            cmd += ["-frames:v", str(max(0, -(-(self.end - first) // self.stride)))]
+        cmd += ["-f", "rawvideo", "-pix_fmt", "bgr24", "pipe:1"]
+        return cmd
+
+    def __iter__(self) -> Iterator[Frame]:
+        first = -(-self.start // self.stride) * self.stride
+        if self.end is not None and first >= self.end:
+            return
+        # stderr goes to a file rather than a pipe, so a chatty decoder can never block on it while we read stdout.
+        self.stderr = tempfile.TemporaryFile()
+        self.proc = subprocess.Popen(self._command(first), stdout=subprocess.PIPE, stderr=self.stderr)
+        assert self.proc.stdout is not None
+        image = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        view = memoryview(image).cast("B")
+        index = first
+        while True:
+            filled = _read_exact(self.proc.stdout, view)
+            if filled < len(view):
+                break
+            yield Frame(index, image, borrowed=True)
+            index += self.stride
+        # Only reached at EOF; a consumer that stops early leaves close() to kill the process, which is not a failure.
+        self._check_exit(filled, len(view))
+
+    def _check_exit(self, filled: int, frame_bytes: int) -> None:
+        assert self.proc is not None and self.stderr is not None
+        returncode = self.proc.wait()
+        if returncode != 0:
+            self.stderr.seek(0)
+            tail = self.stderr.read()[-2000:].decode("utf-8", errors="replace").strip()
+            raise ValueError(f"ffmpeg failed decoding {self.video_path} (exit code {returncode}): {tail}")
+        if filled:
+            raise ValueError(f"ffmpeg output for {self.video_path} ended mid-frame ({filled} of {frame_bytes} bytes).")
+
+    def close(self) -> None:
+        if self.stderr is not None:
+            self.stderr.close()
+            self.stderr = None
+        if self.proc is None:
+            return
+        if self.proc.poll() is None:
+            self.proc.kill()
+        if self.proc.stdout is not None:
+            self.proc.stdout.close()
+        self.proc.wait()
+        self.proc = None
+
+    def __enter__(self) -> "FfmpegFrameSource":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _read_exact(stream: Any, view: memoryview) -> int:
+    filled = 0
+    while filled < len(view):
+        n = stream.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+def open_source(
+    video_path: str | Path,
+    stride: int,
+    seek_min_stride: int = 0,
+    start: int = 0,
+    end: Optional[int] = None,
+    backend: str = "opencv",
+    export_mvs: bool = False,
+    output_width: int = 0,
+    threads: int = 0,
+    keyframes_only: bool = False,
+) -> FrameSource:
+    if backend not in ("opencv", "pyav", "ffmpeg"):
+        raise ValueError(f"Unknown frame source '{backend}'. Expected opencv, pyav or ffmpeg.")
+    if backend == "pyav" or export_mvs or keyframes_only:
+        return PyAvFrameSource(
+            video_path,
+            stride=stride,
+            start=start,
+            end=end,
+            export_mvs=export_mvs,
+            output_width=output_width,
+            threads=threads,
+            keyframes_only=keyframes_only,
+        )
+    if backend == "ffmpeg":
+        return FfmpegFrameSource(video_path, stride=stride, start=start, end=end, output_width=output_width, threads=threads)
+    return CvFrameSource(video_path, stride=stride, seek_min_stride=seek_min_stride, start=start, end=end)
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+
+class QueueFullError(RuntimeError):
+    pass
+
+
+class JobCancelledError(RuntimeError):
+    pass
+
+
+@dataclass
+class Job:
+    id: str
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    progress: Dict[str, Any] = field(default_factory=dict)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    version: int = 0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+    def update_progress(self, progress: Dict[str, Any]) -> None:
+        # Extraction reports progress every few frames, which makes this the cooperative cancellation point.
+        if self.cancel_requested:
+            raise JobCancelledError("Job was cancelled.")
+        self.progress = dict(progress)
+        self.version += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "progress": dict(self.progress),
+            "error": self.error,
+        }
+
+
+JobTarget = Callable[[Job], Dict[str, Any]]
+
+
+@dataclass
+class _Task:
+    job: Job
+    target: JobTarget
+    cleanup: Optional[Callable[[], None]]
+
+
+class JobManager:
+    def __init__(self, workers: int, queue_depth: int, result_ttl_seconds: int) -> None:
+        self.result_ttl_seconds = result_ttl_seconds
+        self._tasks: "queue.Queue[Optional[_Task]]" = queue.Queue(maxsize=max(1, queue_depth))
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._running = 0
+        self._stopping = threading.Event()
+        self._workers: List[threading.Thread] = [
+            threading.Thread(target=self._work, name=f"vf-job-{i}", daemon=True) for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._tasks.qsize()
+
+    @property
+    def running(self) -> int:
+        with self._lock:
+            return self._running
+
+    def saturated(self) -> bool:
+        return self._tasks.full()
+
+    def submit(self, target: JobTarget, cleanup: Optional[Callable[[], None]] = None) -> Job:
+        self._prune()
+        if self._stopping.is_set():
+            raise QueueFullError("Job manager is shutting down.")
+        job = Job(id=uuid.uuid4().hex)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._tasks.put_nowait(_Task(job, target, cleanup))
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            raise QueueFullError("Job queue is full.")
+        return job
+
+    def completed(self, result: Dict[str, Any]) -> Job:
+        self._prune()
+        now = time.time()
+        job = Job(id=uuid.uuid4().hex, status=JOB_DONE, started_at=now, finished_at=now, result=result)
+        with self._lock:
+            self._jobs[job.id] = job
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        self._mark_cancelled(job)
+        return job
+
+    def _mark_cancelled(self, job: Job) -> None:
+        job.cancel_requested = True
+        with self._lock:
+            if job.status == JOB_QUEUED:
+                # The worker that dequeues it only runs the cleanup.
+                job.status = JOB_CANCELLED
+                job.finished_at = time.time()
+                job.version += 1
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._prune()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        self._stopping.set()
+        # Queued jobs are dropped rather than run; running ones stop at their next progress report.
+        while True:
+            try:
+                task = self._tasks.get_nowait()
+            except queue.Empty:
+                break
+            if task is not None:
+                self._mark_cancelled(task.job)
+                self._cleanup(task)
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.finished:
+                    job.cancel_requested = True
+        for _ in self._workers:
+            try:
+                self._tasks.put_nowait(None)
+            except queue.Full:
+                break
+        for worker in self._workers:
+            worker.join(timeout=1.0)
+
+    def _work(self) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is None or self._stopping.is_set():
+                if task is not None:
+                    self._mark_cancelled(task.job)
+                    self._cleanup(task)
+                return
+            job = task.job
+            with self._lock:
+                skip = job.cancel_requested
+                if not skip:
+                    self._running += 1
+                    job.status = JOB_RUNNING
+                    job.started_at = time.time()
+                    job.version += 1
+            if skip:
+                self._cleanup(task)
+                continue
+            try:
+                job.result = task.target(job)
+                job.status = JOB_DONE
+            except JobCancelledError:
+                job.status = JOB_CANCELLED
+            except Exception as exc:
+                job.error = str(exc) or exc.__class__.__name__
+                job.status = JOB_FAILED
+            finally:
+                job.finished_at = time.time()
+                job.version += 1
+                with self._lock:
+                    self._running -= 1
+                self._cleanup(task)
+
+    @staticmethod
+    def _cleanup(task: _Task) -> None:
+        if task.cleanup is not None:
+            try:
+                task.cleanup()
+            except Exception:
+                pass
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.result_ttl_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job.finished_at is not None and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
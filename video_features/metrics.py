@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from video_features.timing import BUCKETS as STAGE_BUCKETS, totals as stage_totals
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+# A scrape-time family: (name, type, help, [(labels, value), ...]).
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def histogram_lines(
+    name: str, names: Sequence[str], values: Sequence[str], bounds: Sequence[float], counts: Sequence[int], total: float
+) -> List[str]:
+    # `counts` are per-bucket (the last one is +Inf); exposition wants them cumulative.
+    lines, cumulative = [], 0
+    for bound, count in zip(list(bounds) + [float("inf")], counts):
+        cumulative += count
+        le = 'le="' + _number(bound) + '"'
+        lines.append(f"{name}_bucket{_labels(names, values, le)} {cumulative}")
+    lines.append(f"{name}_sum{_labels(names, values)} {_number(total)}")
+    lines.append(f"{name}_count{_labels(names, values)} {cumulative}")
+    return lines
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self._lock = threading.Lock()
+        # Unlabelled series start at zero so rate() works before the first event.
+        self._values: Dict[LabelValues, float] = {} if self.label_names else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels[n]) for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.label_names, key)} {_number(value)}" for key, value in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labels: Sequence[str] = ()) -> None:
+        self.name, self.help, self.label_names = name, help, tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        if not self.label_names:
+            self._series[()] = ([0] * (len(self.buckets) + 1), [0.0])
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[n]) for n in self.label_names)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[slot] += 1
+            total[0] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(counts), total[0]) for key, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, counts, total in items:
+            lines += histogram_lines(self.name, self.label_names, key, self.buckets, counts, total)
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: List[Counter | Histogram] = []
+        self._collectors: List[Callable[[], Iterable[Family]]] = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float], labels: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, help, buckets, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def collector(self, fn: Callable[[], Iterable[Family]]) -> None:
+        self._collectors.append(fn)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collect in self._collectors:
+            for name, kind, help, samples in collect():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+        lines += _stage_lines()
+        return "\n".join(lines) + "\n"
+
+
+def _stage_lines() -> List[str]:
+    snapshot = stage_totals.snapshot()
+    if not snapshot:
+        return []
+    name = "vf_stage_seconds"
+    lines = [f"# HELP {name} Wall time per extraction stage call (STAGE_TIMINGS runs only).", f"# TYPE {name} histogram"]
+    for stage, (_, wall, _, buckets) in sorted(snapshot.items()):
+        lines += histogram_lines(name, ("stage",), (stage,), STAGE_BUCKETS, buckets, wall)
+    lines += ["# HELP vf_stage_cpu_seconds_total CPU time spent per extraction stage.", "# TYPE vf_stage_cpu_seconds_total counter"]
+    lines += [f'vf_stage_cpu_seconds_total{{stage="{stage}"}} {_number(cpu)}' for stage, (_, _, cpu, _) in sorted(snapshot.items())]
+    return lines
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter("vf_http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_latency = registry.histogram("vf_http_request_duration_seconds", "HTTP request latency.", LATENCY_BUCKETS, ("method", "route"))
+frames_processed = registry.counter("vf_frames_processed_total", "Frames analysed; rate() gives frames per second.")
+extraction_latency = registry.histogram("vf_extraction_duration_seconds", "Wall time of one video extraction.", LATENCY_BUCKETS)
+upload_bytes = registry.counter("vf_upload_bytes_total", "Upload bytes received onto the temp volume.")
+quota_rejections = registry.counter("vf_quota_rejections_total", "Uploads rejected by size or storage limits.", ("status",))
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+import numpy as np
+from ultralytics import YOLO
+
+
+class SharedDetector:
+    def __init__(self, model_path: str, model: YOLO) -> None:
+        self.model_path = model_path
+        self.model = model
+        self._lock = threading.Lock()
+
+    @property
+    def names(self) -> Dict[int, str]:
+        return getattr(self.model, "names", {}) or {}
+
+    def __call__(self, source: Any, **kwargs: Any) -> List[Any]:
+        # Ultralytics predictors keep per-call state on the model, so concurrent extractions serialize here.
+        with self._lock:
+            return self.model(source, **kwargs)
+
+
+class ModelRegistry:
+    def __init__(self, capacity: int = 2) -> None:
+        self.capacity = max(1, capacity)
+        self._models: "OrderedDict[str, SharedDetector]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._warm: set[str] = set()
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.load_seconds_total = 0.0
+        self.last_load_seconds: Dict[str, float] = {}
+
+    def resize(self, capacity: int) -> None:
+        with self._lock:
+            self.capacity = max(1, capacity)
+            self._evict_locked()
+
+    def get(self, model_path: str) -> SharedDetector:
+        with self._lock:
+            detector = self._models.get(model_path)
+            if detector is not None:
+                self._models.move_to_end(model_path)
+                self.hits += 1
+                return detector
+            load_lock = self._load_locks.setdefault(model_path, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                detector = self._models.get(model_path)
+                if detector is not None:
+                    self._models.move_to_end(model_path)
+                    self.hits += 1
+                    return detector
+            started = time.perf_counter()
+            detector = SharedDetector(model_path, YOLO(model_path))
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._models[model_path] = detector
+                self.loads += 1
+                self.load_seconds_total += elapsed
+                self.last_load_seconds[model_path] = elapsed
+                self._evict_locked()
+            return detector
+
+    def warm(self, model_path: str) -> SharedDetector:
+        detector = self.get(model_path)
+        if model_path not in self._warm:
+            detector(np.zeros((64, 64, 3), dtype=np.uint8), verbose=False)
+            with self._lock:
+                self._warm.add(model_path)
+        return detector
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "loaded": list(self._models.keys()),
+                "warm": sorted(self._warm & set(self._models.keys())),
+                "loads": self.loads,
+                "hits": self.hits,
+                "evictions": self.evictions,
+                "load_seconds_total": self.load_seconds_total,
+                "last_load_seconds": dict(self.last_load_seconds),
+            }
+
+    def _evict_locked(self) -> None:
+        while len(self._models) > self.capacity:
+            evicted, _ = self._models.popitem(last=False)
+            self._warm.discard(evicted)
+            self.evictions += 1
+
+
+registry = ModelRegistry()
+
+
+def get_detector(model_path: str) -> SharedDetector:
+    return registry.get(model_path)
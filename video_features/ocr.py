@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import queue
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+import pytesseract
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+
+ENGINE_WAIT_SECONDS = 0.5
+
+
+class TextRegion(NamedTuple):
+    x: int
+    y: int
+    w: int
+    h: int
+    score: int
+
+
+def _glyph_components(binary: np.ndarray, contrast: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    frame_h = binary.shape[0]
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    x, y, w, h, area = (stats[1:, i] for i in range(5))
+    fill = area / np.maximum(w * h, 1)
+    glyph = (h >= 6) & (h <= frame_h * 0.25) & (w <= h * 2.5) & (fill >= 0.1) & (fill <= 0.95)
+    # Per-pixel measurements only over the blobs that passed the shape checks.
+    lut = np.zeros(n, dtype=np.uint8)
+    lut[1:][glyph] = 255
+    mask = lut[labels]
+    pixels = np.flatnonzero(mask)
+    owners = labels.ravel()[pixels]
+    # Twice the deepest distance-to-edge is the stroke width; solid blobs are about as thick as they are tall.
+    depth = np.zeros(n, dtype=np.float32)
+    np.maximum.at(depth, owners, cv2.distanceTransform(mask, cv2.DIST_L2, 3).ravel()[pixels])
+    stroke = 2 * depth[1:]
+    # Adaptive thresholding also binarizes low-contrast texture (asphalt, foliage); printed text stands well clear of
+    # its local mean.
+    offset = np.bincount(owners, weights=contrast.ravel()[pixels], minlength=n)[1:] / np.maximum(area, 1)
+    glyph &= (stroke <= h * 0.5) & (np.abs(offset) >= 8)
+    lut[1:][~glyph] = 0
+    return lut[labels], np.stack([x, y, w, h, stroke], axis=1)[glyph]
+
+
+def _line_score(glyphs: np.ndarray, min_glyphs: int) -> Optional[TextRegion]:
+    if len(glyphs) < min_glyphs:
+        return None
+    x, y, w, h, stroke = glyphs.T
+    height = float(np.median(h))
+    # One font on one baseline: similar heights, bottoms and stroke widths. Descenders and stray blobs drop out.
+    consistent = (
+        (np.abs(h - height) <= height * 0.35)
+        & (np.abs((y + h) - np.median(y + h)) <= height * 0.25)
+        & (np.abs(stroke - np.median(stroke)) <= np.median(stroke) * 0.5 + 1)
+    )
+    glyphs = glyphs[consistent]
+    if len(glyphs) < min_glyphs:
+        return None
+    x0, y0 = int(glyphs[:, 0].min()), int(glyphs[:, 1].min())
+    x1, y1 = int((glyphs[:, 0] + glyphs[:, 2]).max()), int((glyphs[:, 1] + glyphs[:, 3]).max())
+    if y1 - y0 > height * 1.6 or x1 - x0 < (y1 - y0) * 1.5:
+        return None
+    # A blob spanning several letter widths counts as several glyphs.
+    score = int(np.maximum(1, np.round(glyphs[:, 2] / height)).sum())
+    return TextRegion(x0, y0, x1 - x0, y1 - y0, score)
+
+
+def find_text_regions(binary: np.ndarray, gray: np.ndarray, min_glyphs: int = 3) -> List[TextRegion]:
+    # Glyph-sized blobs that line up horizontally are candidate text lines. Light text on a dark background
+    # shows up as holes in the inverted-threshold halo, so both polarities are searched. `gray` is the image the
+    # binary was thresholded from, with the same 11px mean as reference for the contrast check.
+    contrast = gray.astype(np.float32) - cv2.blur(gray, (11, 11)).astype(np.float32)
+    dark_mask, dark_glyphs = _glyph_components(binary, contrast)
+    light_mask, light_glyphs = _glyph_components(cv2.bitwise_not(binary), contrast)
+    glyphs = np.concatenate([dark_glyphs, light_glyphs])
+    if len(glyphs) < min_glyphs:
+        return []
+    centers = (glyphs[:, :2] + glyphs[:, 2:4] // 2).astype(np.intp)
+    gap = max(3, int(np.median(glyphs[:, 3]) * 1.5))
+    lines = cv2.dilate(cv2.bitwise_or(dark_mask, light_mask), cv2.getStructuringElement(cv2.MORPH_RECT, (gap, 1)))
+    m, line_labels = cv2.connectedComponents(lines, connectivity=8)
+    owner = line_labels[centers[:, 1], centers[:, 0]]
+    regions = []
+    for label in range(1, m):
+        region = _line_score(glyphs[owner == label], min_glyphs)
+        if region is not None:
+            regions.append(region)
+    return sorted(regions, key=lambda r: r.score, reverse=True)
+
+
+def crop_region(image: np.ndarray, region: TextRegion, pad: int = 4) -> np.ndarray:
+    h, w = image.shape[:2]
+    x0, y0 = max(0, region.x - pad), max(0, region.y - pad)
+    x1, y1 = min(w, region.x + region.w + pad), min(h, region.y + region.h + pad)
+    return image[y0:y1, x0:x1]
+
+
+class OcrBackend(ABC):
+    name = "base"
+
+    @abstractmethod
+    def read_text(self, image: np.ndarray, single_line: bool = False) -> str: ...
+
+    def warm(self) -> None:
+        self.read_text(np.zeros((32, 32), dtype=np.uint8))
+
+    def close(self) -> None:
+        pass
+
+
+class PytesseractBackend(OcrBackend):
+    name = "pytesseract"
+
+    def read_text(self, image: np.ndarray, single_line: bool = False) -> str:
+        if single_line:
+            # Presence checks only need the characters, not image_to_data's per-word layout table.
+            return "".join(pytesseract.image_to_string(image, config="--psm 7").split())
+        data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+        return "".join(data.get("text", [])).strip()
+
+
+class TesserocrBackend(OcrBackend):
+    name = "tesserocr"
+
+    def __init__(self, workers: int, lang: str = "eng") -> None:
+        if tesserocr is None:
+            raise RuntimeError("OCR backend 'tesserocr' requested but the tesserocr package is not installed.")
+        self.lang = lang
+        self.max_engines = max(1, workers)
+        self._idle: "queue.Queue[Any]" = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def read_text(self, image: np.ndarray, single_line: bool = False) -> str:
+        api = self._acquire()
+        try:
+            gray = np.ascontiguousarray(image)
+            h, w = gray.shape[:2]
+            channels = 1 if gray.ndim == 2 else gray.shape[2]
+            api.SetPageSegMode(tesserocr.PSM.SINGLE_LINE if single_line else tesserocr.PSM.AUTO)
+            api.SetImageBytes(gray.tobytes(), w, h, channels, w * channels)
+            # Match image_to_data's word join: whitespace between words does not count towards text_min_chars.
+            return "".join(api.GetUTF8Text().split())
+        finally:
+            api.Clear()
+            self._idle.put(api)
+
+    def close(self) -> None:
+        # Only idle engines are ended; ones checked out by a read in flight come back to the pool afterwards.
+        while True:
+            try:
+                api = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            api.End()
+            with self._lock:
+                self._created -= 1
+
+    def _acquire(self) -> Any:
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                create = self._created < self.max_engines
+                if create:
+                    self._created += 1
+            if create:
+                try:
+                    return tesserocr.PyTessBaseAPI(lang=self.lang)
+                except BaseException:
+                    # Give the slot back, or failed constructions would leave later reads waiting for engines that
+                    # never exist.
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            # Waiting with a timeout re-checks for a slot freed by a construction that failed meanwhile.
+            try:
+                return self._idle.get(timeout=ENGINE_WAIT_SECONDS)
+            except queue.Empty:
+                continue
+
+
+_backends: Dict[Tuple[str, int], OcrBackend] = {}
+_backends_lock = threading.Lock()
+_warm: set[Tuple[str, int]] = set()
+
+
+def _key(name: str, workers: int) -> Tuple[str, int]:
+    if name == "auto":
+        name = "tesserocr" if tesserocr is not None else "pytesseract"
+    if name not in ("tesserocr", "pytesseract"):
+        raise ValueError(f"Unknown OCR backend '{name}'. Expected auto, tesserocr or pytesseract.")
+    return name, (max(1, workers) if name == "tesserocr" else 0)
+
+
+def get_ocr_backend(name: str = "auto", workers: int = 1) -> OcrBackend:
+    key = _key(name, workers)
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            backend = TesserocrBackend(workers) if key[0] == "tesserocr" else PytesseractBackend()
+            _backends[key] = backend
+        return backend
+
+
+def is_ocr_warm(name: str = "auto", workers: int = 1) -> bool:
+    key = _key(name, workers)
+    with _backends_lock:
+        return key in _warm
+
+
+def warm_ocr_backend(name: str = "auto", workers: int = 1) -> OcrBackend:
+    key = _key(name, workers)
+    backend = get_ocr_backend(name, workers)
+    if key not in _warm:
+        backend.warm()
+        with _backends_lock:
+            _warm.add(key)
+    return backend
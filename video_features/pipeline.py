@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from video_features.extractor import FrameCallback, ProgressCallback, VideoFeatureExtractor, _RunState
+from video_features.frames import FrameSource
+
+_END = object()
+
+
+class _DecodeThread(threading.Thread):
+    def __init__(self, source: FrameSource, frames: "queue.Queue[Any]") -> None:
+        super().__init__(name="vf-decode", daemon=True)
+        self.source = source
+        self.frames = frames
+        self.stopped = threading.Event()
+        self.error: Optional[BaseException] = None
+
+    def run(self) -> None:
+        try:
+            for frame in self.source:
+                if frame.borrowed:
+                    frame = frame._replace(image=frame.image.copy(), borrowed=False)
+                if not self._put(frame):
+                    return
+        except BaseException as exc:
+            self.error = exc
+        finally:
+            self._put(_END)
+
+    def _put(self, item: Any) -> bool:
+        while not self.stopped.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+
+def run_pipelined(
+    extractor: VideoFeatureExtractor,
+    video_file: Path,
+    progress: Optional[ProgressCallback] = None,
+    on_frame: Optional[FrameCallback] = None,
+) -> Dict[str, Any]:
+    cfg = extractor.config
+    frames: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, cfg.pipeline_queue_size))
+    state = _RunState(on_frame=on_frame)
+
+    with extractor._open_source(video_file) as source:
+        state.fps = source.fps
+        decoder = _DecodeThread(source, frames)
+        decoder.start()
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, cfg.pipeline_text_workers), thread_name_prefix="vf-text") as text_pool, \
+                    ThreadPoolExecutor(max_workers=1, thread_name_prefix="vf-detect") as detection_pool:
+                while True:
+                    frame = frames.get()
+                    if frame is _END:
+                        break
+                    extractor._observe(state, frame, text_executor=text_pool, detection_executor=detection_pool)
+                    extractor._report(progress, state, source.total_frames)
+                if decoder.error is not None:
+                    raise decoder.error
+                extractor._drain(state, detection_executor=detection_pool)
+                extractor._report(progress, state, source.total_frames, force=True)
+        finally:
+            decoder.stop()
+            decoder.join()
+        return extractor._summarize(video_file, source, state)
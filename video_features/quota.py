@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+def dir_size_bytes(root: Path) -> int:
+    total = 0
+    for p in root.rglob("*"):
+        try:
+            if p.is_file():
+                total += p.stat().st_size
+        except OSError:
+            continue
+    return total
+
+
+class UsageLedger:
+    def __init__(self, root: Path, reconcile_seconds: float = 60.0) -> None:
+        self.root = root
+        self.reconcile_seconds = reconcile_seconds
+        self._lock = threading.Lock()
+        self._used = dir_size_bytes(root) if root.exists() else 0
+        self._scan_delta: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def used(self) -> int:
+        with self._lock:
+            return self._used
+
+    def try_reserve(self, n: int, limit: int) -> bool:
+        with self._lock:
+            if self._used + n > limit:
+                return False
+            self._apply_locked(n)
+            return True
+
+    def release(self, n: int) -> None:
+        if n <= 0:
+            return
+        with self._lock:
+            self._apply_locked(-n)
+
+    def release_file(self, path: str | Path) -> None:
+        try:
+            size = os.stat(path).st_size
+            os.unlink(path)
+        except OSError:
+            return
+        self.release(size)
+
+    def reconcile(self) -> int:
+        with self._lock:
+            self._scan_delta = 0
+        scanned = dir_size_bytes(self.root)
+        with self._lock:
+            # Changes made while the scan walked the tree may or may not be in `scanned`; keep them on top.
+            self._used = max(0, scanned + (self._scan_delta or 0))
+            self._scan_delta = None
+            return self._used
+
+    def start(self) -> None:
+        if self._thread is not None or self.reconcile_seconds <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="quota-reconcile", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _apply_locked(self, n: int) -> None:
+        self._used = max(0, self._used + n)
+        if self._scan_delta is not None:
+            self._scan_delta += n
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.reconcile_seconds):
+            try:
+                self.reconcile()
+            except OSError:
+                continue
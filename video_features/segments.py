@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+from multiprocessing.managers import SyncManager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from video_features.extractor import (
+    PROGRESS_EVERY_FRAMES,
+    FeatureExtractionConfig,
+    ProgressCallback,
+    VideoFeatureExtractor,
+    _RunState,
+)
+from video_features.frames import FrameSource
+
+_worker: Optional[VideoFeatureExtractor] = None
+
+_pools: Dict[FeatureExtractionConfig, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+_manager: Optional[SyncManager] = None
+
+# How long the parent waits on the progress queue before checking for finished segments.
+PROGRESS_POLL_SECONDS = 0.2
+
+
+def _init_worker(config: FeatureExtractionConfig) -> None:
+    global _worker
+    _worker = VideoFeatureExtractor(replace(config, segments=1, pipeline=False))
+
+
+def _get_pool(config: FeatureExtractionConfig) -> ProcessPoolExecutor:
+    # Workers load YOLO and OCR once in their initializer, so pools outlive an extraction and are shared by every
+    # extraction with the same config.
+    with _pools_lock:
+        pool = _pools.get(config)
+        if pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=config.segment_workers if config.segment_workers > 0 else config.segments,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(config,),
+            )
+            _pools[config] = pool
+        return pool
+
+
+def _discard_pool(config: FeatureExtractionConfig, pool: ProcessPoolExecutor) -> None:
+    with _pools_lock:
+        if _pools.get(config) is pool:
+            del _pools[config]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _get_manager() -> SyncManager:
+    # Pool workers are spawned once and reused, so per-run queues and events must be manager proxies, which can be
+    # passed with each task, rather than multiprocessing primitives inherited at spawn.
+    global _manager
+    with _pools_lock:
+        if _manager is None:
+            _manager = multiprocessing.get_context("spawn").Manager()
+        return _manager
+
+
+def shutdown_segment_pools() -> None:
+    global _manager
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+        manager, _manager = _manager, None
+    for pool in pools:
+        pool.shutdown(wait=True, cancel_futures=True)
+    if manager is not None:
+        manager.shutdown()
+
+
+def segment_bounds(total_frames: int, stride: int, segments: int) -> List[Tuple[int, int]]:
+    kept = -(-total_frames // stride)
+    segments = max(1, min(segments, kept))
+    edges = [round(k * kept / segments) * stride for k in range(segments)] + [total_frames]
+    return [(edges[k], edges[k + 1]) for k in range(segments) if edges[k] < edges[k + 1]]
+
+
+def _run_segment(
+    video_path: str,
+    start: int,
+    end: Optional[int],
+    segment: int = 0,
+    updates: Optional["queue.Queue[Tuple[int, int]]"] = None,
+    cancel: Optional[threading.Event] = None,
+) -> _RunState:
+    extractor = _worker
+    assert extractor is not None
+    stride = extractor.config.frame_stride
+    # Kept frames before `start` still advance the OCR/YOLO cadence in the sequential loop.
+    offset = start // stride
+    state = _RunState(processed_frames=offset)
+    # Decode the last kept frame of the previous segment so cuts and flow across the seam are counted once.
+    prime_from = max(0, start - stride)
+    with extractor._open_source(Path(video_path), start=prime_from, end=end) as source:
+        for frame in source:
+            if frame.index < start:
+                extractor._prime(state, frame)
+                continue
+            extractor._observe(state, frame)
+            done = state.processed_frames - offset
+            if updates is not None and done % PROGRESS_EVERY_FRAMES == 0:
+                # The parent abandons a cancelled run, so the partial state is drained and returned but never merged.
+                if cancel is not None and cancel.is_set():
+                    break
+                updates.put((segment, done))
+        extractor._drain(state)
+    state.processed_frames -= offset
+    state.prev_hist = None
+    state.prev_gray = None
+    state.buffers = None
+    if extractor.timer is not None:
+        state.timings = extractor.timer.snapshot()
+        extractor.timer.reset()
+    return state
+
+
+def run_segmented(
+    extractor: VideoFeatureExtractor,
+    video_file: Path,
+    progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    with extractor._open_source(video_file) as source:
+        if source.total_frames > 0:
+            return _run_parallel(extractor, video_file, source, progress)
+    # Without a frame count there is nothing to split on; fall back to one sequential pass on this extractor so its
+    # stage timer keeps the timings.
+    return extractor._extract_sequential(video_file, progress, None)
+
+
+def _run_parallel(
+    extractor: VideoFeatureExtractor,
+    video_file: Path,
+    source: FrameSource,
+    progress: Optional[ProgressCallback],
+) -> Dict[str, Any]:
+    cfg = extractor.config
+    bounds = segment_bounds(source.total_frames, cfg.frame_stride, cfg.segments)
+    pool = _get_pool(cfg)
+    merged = _RunState()
+    # The last segment reads to EOF in case the container under-reports its frame count.
+    ends = [end for _, end in bounds[:-1]] + [None]
+    manager = _get_manager() if progress is not None else None
+    updates = manager.Queue() if manager is not None else None
+    cancel = manager.Event() if manager is not None else None
+    parts: Dict["Future[_RunState]", int] = {}
+    try:
+        for segment, ((start, _), end) in enumerate(zip(bounds, ends)):
+            parts[pool.submit(_run_segment, str(video_file), start, end, segment, updates, cancel)] = segment
+        _collect(extractor, parts, merged, source.total_frames, progress, updates)
+    except BrokenProcessPool:
+        # A worker died (OOM kill, crash); the next extraction starts a fresh pool.
+        _discard_pool(cfg, pool)
+        raise
+    except BaseException:
+        # Cancelled from the progress callback or failed in one segment: the other workers stop at their next
+        # progress check, and the shared pool is left running for later extractions.
+        if cancel is not None:
+            cancel.set()
+        for part in parts:
+            part.cancel()
+        wait(parts)
+        raise
+    return extractor._summarize(video_file, source, merged)
+
+
+def _collect(
+    extractor: VideoFeatureExtractor,
+    parts: Dict["Future[_RunState]", int],
+    merged: _RunState,
+    total_frames: int,
+    progress: Optional[ProgressCallback],
+    updates: Optional["queue.Queue[Tuple[int, int]]"],
+) -> None:
+    in_flight: Dict[int, int] = {}
+    pending = dict(parts)
+    while pending:
+        changed = False
+        if updates is None:
+            wait(pending, return_when=FIRST_COMPLETED)
+        else:
+            try:
+                segment, done = updates.get(timeout=PROGRESS_POLL_SECONDS)
+                while True:
+                    in_flight[segment] = done
+                    changed = True
+                    segment, done = updates.get_nowait()
+            except queue.Empty:
+                pass
+        for part in [p for p in pending if p.done()]:
+            state = part.result()
+            in_flight.pop(pending.pop(part), None)
+            merged.absorb(state)
+            if extractor.timer is not None and state.timings:
+                extractor.timer.merge(state.timings)
+            changed = True
+        if changed:
+            # Finished segments contribute their counters; running ones only their frame counts so far.
+            snapshot = replace(merged, processed_frames=merged.processed_frames + sum(in_flight.values()))
+            extractor._report(progress, snapshot, total_frames, force=True)
@@ -25,6 +25,13 @@ def _get_float(name: str, default: float) -> float:
         return default
 
 
+def _get_bool(name: str, default: bool) -> bool:
+    v = os.getenv(name)
+    if not v:
+        return default
+    return v.strip().lower() in ("1", "true", "yes", "on")
+
+
 def _get_tuple_ints(name: str, default: Tuple[int, ...]) -> Tuple[int, ...]:
     raw = _get(name, ",".join(str(x) for x in default)).split(",")
     try:
@@ -42,9 +49,22 @@ class AppSettings:
     allowed_mime_prefix: str
     max_upload_bytes: int
     upload_chunk_bytes: int
+    upload_preallocate: bool
+    disk_usage_sample_bytes: int
     temp_volume_dir: Path
     volume_quota_bytes: int
     volume_min_free_bytes: int
+    quota_reconcile_seconds: int
+    model_registry_size: int
+    warmup_models: bool
+    job_workers: int
+    job_queue_depth: int
+    job_result_ttl_seconds: int
+    job_event_interval_seconds: float
+    ready_max_queue_depth: int
+    result_cache_enabled: bool
+    result_cache_dir: Path
+    result_cache_max_bytes: int
 
     @staticmethod
     def load() -> "AppSettings":
@@ -55,9 +75,22 @@ class AppSettings:
             allowed_mime_prefix=_get("ALLOWED_MIME_PREFIX", "video/"),
             max_upload_bytes=_get_int("MAX_UPLOAD_BYTES", 500 * 1024 * 1024),
             upload_chunk_bytes=_get_int("UPLOAD_CHUNK_BYTES", 1 * 1024 * 1024),
+            upload_preallocate=_get_bool("UPLOAD_PREALLOCATE", True),
+            disk_usage_sample_bytes=_get_int("DISK_USAGE_SAMPLE_BYTES", 64 * 1024 * 1024),
             temp_volume_dir=Path(_get("TEMP_VOLUME_DIR", "/tmp/video-tmp")),
             volume_quota_bytes=_get_int("VOLUME_QUOTA_BYTES", 10 * 1024 * 1024 * 1024),
             volume_min_free_bytes=_get_int("VOLUME_MIN_FREE_BYTES", 2 * 1024 * 1024 * 1024),
+            quota_reconcile_seconds=_get_int("QUOTA_RECONCILE_SECONDS", 60),
+            model_registry_size=_get_int("MODEL_REGISTRY_SIZE", 2),
+            warmup_models=_get_bool("WARMUP_MODELS", True),
+            job_workers=_get_int("JOB_WORKERS", 2),
+            job_queue_depth=_get_int("JOB_QUEUE_DEPTH", 8),
+            job_result_ttl_seconds=_get_int("JOB_RESULT_TTL_SECONDS", 3600),
+            job_event_interval_seconds=_get_float("JOB_EVENT_INTERVAL_SECONDS", 0.5),
+            ready_max_queue_depth=_get_int("READY_MAX_QUEUE_DEPTH", 4),
+            result_cache_enabled=_get_bool("RESULT_CACHE_ENABLED", True),
+            result_cache_dir=Path(_get("RESULT_CACHE_DIR", "/tmp/video-cache")),
+            result_cache_max_bytes=_get_int("RESULT_CACHE_MAX_BYTES", 256 * 1024 * 1024),
         )
 
 
@@ -70,6 +103,28 @@ class ExtractorSettings:
     text_min_chars: int
     yolo_model: str
     yolo_frame_stride: int
+    seek_min_stride: int
+    frame_source: str
+    decode_threads: int
+    decode_keyframes_only: bool
+    yolo_batch_size: int
+    yolo_batch_max_bytes: int
+    pipeline: bool
+    pipeline_queue_size: int
+    pipeline_text_workers: int
+    segments: int
+    segment_workers: int
+    ocr_backend: str
+    ocr_workers: int
+    text_prefilter: bool
+    text_prefilter_min_score: int
+    text_crop_regions: bool
+    text_early_exit: bool
+    flow_width: int
+    reuse_buffers: bool
+    stage_timings: bool
+    motion_method: str
+    lk_grid_step: int
     farneback_pyr_scale: float
     farneback_levels: int
     farneback_winsize: int
@@ -79,6 +134,7 @@ class ExtractorSettings:
     farneback_flags: int
     histogram_bins: Tuple[int, int, int]
     histogram_ranges: Tuple[int, int, int, int, int, int]
+    histogram_decimate: int
 
     @staticmethod
     def load() -> "ExtractorSettings":
@@ -90,6 +146,28 @@ class ExtractorSettings:
             text_min_chars=_get_int("TEXT_MIN_CHARS", 8),
             yolo_model=_get("YOLO_MODEL", "yolov8n.pt"),
             yolo_frame_stride=_get_int("YOLO_FRAME_STRIDE", 15),
+            seek_min_stride=_get_int("SEEK_MIN_STRIDE", 0),
+            frame_source=_get("FRAME_SOURCE", "opencv"),
+            decode_threads=_get_int("DECODE_THREADS", 0),
+            decode_keyframes_only=_get_bool("DECODE_KEYFRAMES_ONLY", False),
+            yolo_batch_size=_get_int("YOLO_BATCH_SIZE", 8),
+            yolo_batch_max_bytes=_get_int("YOLO_BATCH_MAX_BYTES", 64 * 1024 * 1024),
+            pipeline=_get_bool("PIPELINE", False),
+            pipeline_queue_size=_get_int("PIPELINE_QUEUE_SIZE", 8),
+            pipeline_text_workers=_get_int("PIPELINE_TEXT_WORKERS", 2),
+            segments=_get_int("SEGMENTS", 1),
+            segment_workers=_get_int("SEGMENT_WORKERS", 0),
+            ocr_backend=_get("OCR_BACKEND", "auto"),
+            ocr_workers=_get_int("OCR_WORKERS", 2),
+            text_prefilter=_get_bool("TEXT_PREFILTER", False),
+            text_prefilter_min_score=_get_int("TEXT_PREFILTER_MIN_SCORE", 8),
+            text_crop_regions=_get_bool("TEXT_CROP_REGIONS", False),
+            text_early_exit=_get_bool("TEXT_EARLY_EXIT", False),
+            flow_width=_get_int("FLOW_WIDTH", 0),
+            reuse_buffers=_get_bool("REUSE_BUFFERS", False),
+            stage_timings=_get_bool("STAGE_TIMINGS", False),
+            motion_method=_get("MOTION_METHOD", "farneback"),
+            lk_grid_step=_get_int("LK_GRID_STEP", 16),
             farneback_pyr_scale=_get_float("FARNEBACK_PYR_SCALE", 0.5),
             farneback_levels=_get_int("FARNEBACK_LEVELS", 3),
             farneback_winsize=_get_int("FARNEBACK_WINSIZE", 15),
@@ -99,4 +177,5 @@ class ExtractorSettings:
             farneback_flags=_get_int("FARNEBACK_FLAGS", 0),
             histogram_bins=tuple(_get_tuple_ints("HISTOGRAM_BINS", (8, 8, 8)))[:3],  # type: ignore
             histogram_ranges=tuple(_get_tuple_ints("HISTOGRAM_RANGES", (0, 180, 0, 256, 0, 256)))[:6],  # type: ignore
+            histogram_decimate=_get_int("HISTOGRAM_DECIMATE", 1),
         )
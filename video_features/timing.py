@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+# Upper bounds (seconds) of the per-call wall-time histogram, Prometheus-style; the last bucket is +Inf.
+BUCKETS: Tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class _Stage:
+    __slots__ = ("calls", "wall", "cpu", "buckets")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+
+
+class StageTimer:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stages: Dict[str, _Stage] = {}
+
+    def add(self, stage: str, wall: float, cpu: float) -> None:
+        slot = next((i for i, bound in enumerate(BUCKETS) if wall <= bound), len(BUCKETS))
+        with self._lock:
+            s = self._stages.get(stage)
+            if s is None:
+                s = self._stages[stage] = _Stage()
+            s.calls += 1
+            s.wall += wall
+            s.cpu += cpu
+            s.buckets[slot] += 1
+
+    def wrap(self, stage: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            # thread_time is per-thread CPU, so OCR/YOLO calls on worker threads are charged correctly.
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - wall, time.thread_time() - cpu)
+
+        return timed
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self) -> Dict[str, List[Any]]:
+        with self._lock:
+            return {name: [s.calls, s.wall, s.cpu, list(s.buckets)] for name, s in self._stages.items()}
+
+    def merge(self, snapshot: Dict[str, List[Any]]) -> None:
+        with self._lock:
+            for name, (calls, wall, cpu, buckets) in snapshot.items():
+                s = self._stages.get(name)
+                if s is None:
+                    s = self._stages[name] = _Stage()
+                s.calls += calls
+                s.wall += wall
+                s.cpu += cpu
+                s.buckets = [a + b for a, b in zip(s.buckets, buckets)]
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for name, (calls, wall, cpu, buckets) in sorted(self.snapshot().items()):
+            cumulative, histogram = 0, {}
+            for bound, count in zip([str(b) for b in BUCKETS] + ["+Inf"], buckets):
+                cumulative += count
+                histogram[bound] = cumulative
+            out[name] = {
+                "calls": calls,
+                "wall_seconds": wall,
+                "cpu_seconds": cpu,
+                "ms_per_call": wall / calls * 1000.0 if calls else 0.0,
+                "histogram": histogram,
+            }
+        return out
+
+
+class TimedSource:
+    def __init__(self, source: Any, timer: StageTimer, stage: str = "decode") -> None:
+        self.source = source
+        self.timer = timer
+        self.stage = stage
+        self.fps = source.fps
+        self.total_frames = source.total_frames
+
+    def __iter__(self) -> Iterator[Any]:
+        frames = iter(self.source)
+        while True:
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                frame = next(frames)
+            except StopIteration:
+                return
+            finally:
+                self.timer.add(self.stage, time.perf_counter() - wall, time.thread_time() - cpu)
+            yield frame
+
+    def close(self) -> None:
+        self.source.close()
+
+    def __enter__(self) -> "TimedSource":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+# Process-wide totals across every instrumented run, for the service's /metrics histograms.
+totals = StageTimer()